@@ -8,6 +8,7 @@ import json
 from typing import Dict, Any
 from fastapi import WebSocket
 
+from ..core.connection import manager
 from ..core.state import app_state
 from ..services.conversations import ConversationService
 from ..services.screenshots import ScreenshotHandler
@@ -24,6 +25,10 @@ def extract_skill_slash_commands(message: str) -> tuple[list[dict], str]:
     If a slash command is recognized but the skill is disabled, strip it
     from the message silently and skip injection.
     """
+    if "/" not in message:
+        # No slash commands possible; skip the skills lookup
+        return [], " ".join(message.split())
+
     all_skills = db.get_all_skills()
     slash_map = {s["slash_command"]: s for s in all_skills}
 
@@ -69,8 +74,6 @@ class MessageHandler:
 
     async def _handle_submit_query(self, data: Dict[str, Any]):
         """Handle query submission."""
-        import asyncio
-
         query_text = data.get("content", "").strip()
         capture_mode = data.get("capture_mode", "none")
         model = data.get("model", "")
@@ -80,9 +83,7 @@ class MessageHandler:
             app_state.selected_model = model
 
         if not query_text:
-            await self.websocket.send_text(
-                json.dumps({"type": "error", "content": "Empty query"})
-            )
+            await manager.send_json_to(self.websocket, "error", "Empty query")
             return
 
         # Parse slash commands from the query text
@@ -94,11 +95,10 @@ class MessageHandler:
         # Use cleaned query (slash commands stripped) for the LLM only
         llm_query = cleaned_query.strip() if cleaned_query.strip() else query_text
 
-        # Run as background task — pass original text for display/save, cleaned for LLM
-        asyncio.create_task(
-            ConversationService.submit_query(
-                query_text, capture_mode, forced_skills, llm_query=llm_query
-            )
+        # Queue for the background worker — pass original text for display/save,
+        # cleaned for LLM
+        await ConversationService.enqueue_query(
+            query_text, capture_mode, forced_skills, llm_query=llm_query
         )
 
     async def _handle_clear_context(self, data: Dict[str, Any]):
@@ -118,6 +118,18 @@ class MessageHandler:
             app_state.capture_mode = mode
             print(f"Capture mode set to: {mode}")
 
+    async def _handle_subscribe(self, data: Dict[str, Any]):
+        """Handle re-subscribing to optional message types (thinking)."""
+        channels = data.get("channels") or []
+        if isinstance(channels, list):
+            manager.set_subscribed(self.websocket, channels, True)
+
+    async def _handle_unsubscribe(self, data: Dict[str, Any]):
+        """Handle opting out of optional message types (thinking)."""
+        channels = data.get("channels") or []
+        if isinstance(channels, list):
+            manager.set_subscribed(self.websocket, channels, False)
+
     async def _handle_stop_streaming(self, data: Dict[str, Any]):
         """Handle stop streaming request — cancels all in-flight work."""
         # Cancel via RequestContext (new path)
@@ -128,6 +140,9 @@ class MessageHandler:
         # Legacy flag for subsystems not yet migrated
         app_state.stop_streaming = True
 
+        # Queries queued behind this one would otherwise start right away
+        ConversationService.drop_queued_queries()
+
         # Cancel any pending terminal approvals/sessions so tool loop unblocks
         from ..services.terminal import terminal_service
 
@@ -140,10 +155,8 @@ class MessageHandler:
         conversations = ConversationService.get_conversations(
             limit=limit, offset=offset
         )
-        await self.websocket.send_text(
-            json.dumps(
-                {"type": "conversations_list", "content": json.dumps(conversations)}
-            )
+        await manager.send_json_to(
+            self.websocket, "conversations_list", json.dumps(conversations)
         )
 
     async def _handle_load_conversation(self, data: Dict[str, Any]):
@@ -151,15 +164,10 @@ class MessageHandler:
         conv_id = data.get("conversation_id")
         if conv_id:
             messages = ConversationService.get_full_conversation(conv_id)
-            await self.websocket.send_text(
-                json.dumps(
-                    {
-                        "type": "conversation_loaded",
-                        "content": json.dumps(
-                            {"conversation_id": conv_id, "messages": messages}
-                        ),
-                    }
-                )
+            await manager.send_json_to(
+                self.websocket,
+                "conversation_loaded",
+                json.dumps({"conversation_id": conv_id, "messages": messages}),
             )
 
     async def _handle_delete_conversation(self, data: Dict[str, Any]):
@@ -167,13 +175,10 @@ class MessageHandler:
         conv_id = data.get("conversation_id")
         if conv_id:
             ConversationService.delete_conversation(conv_id)
-            await self.websocket.send_text(
-                json.dumps(
-                    {
-                        "type": "conversation_deleted",
-                        "content": json.dumps({"conversation_id": conv_id}),
-                    }
-                )
+            await manager.send_json_to(
+                self.websocket,
+                "conversation_deleted",
+                json.dumps({"conversation_id": conv_id}),
             )
 
     async def _handle_search_conversations(self, data: Dict[str, Any]):
@@ -184,8 +189,8 @@ class MessageHandler:
         else:
             results = ConversationService.get_conversations(limit=50)
 
-        await self.websocket.send_text(
-            json.dumps({"type": "conversations_list", "content": json.dumps(results)})
+        await manager.send_json_to(
+            self.websocket, "conversations_list", json.dumps(results)
         )
 
     async def _handle_resume_conversation(self, data: Dict[str, Any]):
@@ -207,9 +212,7 @@ class MessageHandler:
             # Run transcription in a separate thread to avoid blocking the event loop
             text = await run_in_thread(app_state.transcription_service.stop_recording)
 
-            await self.websocket.send_text(
-                json.dumps({"type": "transcription_result", "content": text})
-            )
+            await manager.send_json_to(self.websocket, "transcription_result", text)
 
     # ---------------------------------------------------------
     # Terminal Handlers
@@ -26,6 +26,9 @@ async def websocket_endpoint(websocket: WebSocket):
       - delete_conversation: Delete a conversation
       - search_conversations: Search conversations by text
       - resume_conversation: Resume a previous conversation
+      - unsubscribe / subscribe: Stop or resume receiving optional message
+        types (currently thinking_chunk and thinking_complete), given as
+        {"channels": [...]}; clients receive everything by default
 
     Server -> Client broadcast messages (JSON):
       - ready: Server is ready to receive queries
@@ -52,22 +55,21 @@ async def websocket_endpoint(websocket: WebSocket):
     """
     await manager.connect(websocket)
     
-    # Notify client that server is ready
-    await websocket.send_text(json.dumps({
-        "type": "ready", 
-        "content": "Server ready. You can start chatting or take a screenshot (Alt+.)"
-    }))
+    # Notify client that server is ready. Direct replies go through the
+    # client's send queue, which its relay task alone writes to the socket.
+    await manager.send_json_to(
+        websocket,
+        "ready",
+        "Server ready. You can start chatting or take a screenshot (Alt+.)",
+    )
     
     # Send any existing screenshots to newly connected client
     for ss in app_state.screenshot_list:
-        await websocket.send_text(json.dumps({
-            "type": "screenshot_added",
-            "content": {
-                "id": ss["id"],
-                "name": ss["name"],
-                "thumbnail": ss["thumbnail"]
-            }
-        }))
+        await manager.send_json_to(websocket, "screenshot_added", {
+            "id": ss["id"],
+            "name": ss["name"],
+            "thumbnail": ss["thumbnail"]
+        })
     
     handler = MessageHandler(websocket)
     
@@ -85,13 +87,9 @@ async def websocket_endpoint(websocket: WebSocket):
                 print(f"[WS] Error handling message type '{data.get('type')}': {e}")
                 import traceback
                 traceback.print_exc()
-                try:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "content": f"Internal error: {str(e)[:200]}"
-                    }))
-                except Exception:
-                    pass
+                await manager.send_json_to(
+                    websocket, "error", f"Internal error: {str(e)[:200]}"
+                )
             
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -27,6 +27,16 @@ MAX_PORT_ATTEMPTS = 10
 DEFAULT_MODEL = "qwen3-vl:8b-instruct"
 MAX_MCP_TOOL_ROUNDS = 30
 
+# How long Ollama keeps the model loaded after a request. Longer than the
+# server's 5-minute default so follow-up questions about the same screenshot
+# hit a warm model and its cached prompt prefix instead of a reload.
+OLLAMA_KEEP_ALIVE = os.environ.get("XPDITE_OLLAMA_KEEP_ALIVE", "30m")
+
+# Exact-match cache for cloud model responses. Off by default: a chat
+# assistant should normally answer afresh. Useful when iterating on the same
+# prompts during development (set XPDITE_LLM_RESPONSE_CACHE=1).
+LLM_RESPONSE_CACHE = os.environ.get("XPDITE_LLM_RESPONSE_CACHE") == "1"
+
 
 # Capture modes
 class CaptureMode:
@@ -3,11 +3,72 @@ WebSocket connection management.
 
 Handles tracking of active WebSocket connections and message broadcasting.
 """
-from typing import List, Dict, Any
+import asyncio
+from collections import deque
+from typing import Any, Dict, Iterable, Set
 from fastapi import WebSocket
 import json
 
 
+# Messages queued per client before streamed chunks start being merged into
+# the newest queued chunk instead of taking new slots.
+_SEND_QUEUE_SIZE = 256
+
+# Hard limit per client; a client this far behind is dropped as unresponsive.
+_SEND_QUEUE_LIMIT = 2 * _SEND_QUEUE_SIZE
+
+# Streamed message types whose contents are deltas, so consecutive ones can
+# be concatenated without changing what the client renders.
+_MERGEABLE_TYPES = frozenset(("response_chunk", "thinking_chunk"))
+
+# Message types a client may unsubscribe from. Everything else is always
+# delivered, and every client starts subscribed to these too.
+OPTIONAL_CHANNELS = frozenset(("thinking_chunk", "thinking_complete"))
+
+
+class _ClientQueue:
+    """
+    One client's outgoing messages, bounded with a merge-on-overflow policy.
+
+    Entries are [message_type, content, serialized_message]. Past
+    _SEND_QUEUE_SIZE entries, a streamed chunk is appended to the newest
+    queued chunk of the same type rather than queued separately, so a slow
+    client gets fewer, larger frames but no missing text. Other messages
+    (completions, errors, state changes) are always queued.
+
+    Messages whose type is in muted (see OPTIONAL_CHANNELS) are discarded.
+    """
+
+    def __init__(self):
+        self._entries: deque = deque()
+        self._ready = asyncio.Event()
+        self.muted: Set[str] = set()
+
+    def put(self, message: str, message_type: str | None, content: Any) -> bool:
+        """Queue a message. Returns False if the client is too far behind."""
+        if message_type in self.muted:
+            return True
+        entries = self._entries
+        if len(entries) >= _SEND_QUEUE_SIZE and message_type in _MERGEABLE_TYPES:
+            last = entries[-1]
+            if last[0] == message_type:
+                last[1] += content
+                last[2] = json.dumps({"type": message_type, "content": last[1]})
+                return True
+        if len(entries) >= _SEND_QUEUE_LIMIT:
+            return False
+        entries.append([message_type, content, message])
+        self._ready.set()
+        return True
+
+    async def get(self) -> str:
+        """Wait for and return the next serialized message."""
+        while not self._entries:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._entries.popleft()[2]
+
+
 class ConnectionManager:
     """
     Manages WebSocket connections for real-time communication.
@@ -16,42 +77,135 @@ class ConnectionManager:
     - Connection tracking
     - Safe message broadcasting
     - Automatic disconnection cleanup
+
+    Each connection has its own send queue drained by a relay task, so a
+    broadcast only enqueues and never waits on a slow client. The relay is
+    the only writer to its socket: replies meant for a single client go
+    through send_to, which queues them behind that client's broadcasts.
     """
     
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
+        self._send_queues: Dict[WebSocket, _ClientQueue] = {}
+        self._relay_tasks: Dict[WebSocket, asyncio.Task] = {}
 
     async def connect(self, websocket: WebSocket):
         """Accept and track a new WebSocket connection."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        queue = _ClientQueue()
+        self._send_queues[websocket] = queue
+        self._relay_tasks[websocket] = asyncio.create_task(
+            self._relay(websocket, queue)
+        )
+        self.active_connections.add(websocket)
 
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket from tracked connections."""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
+        self._send_queues.pop(websocket, None)
+        task = self._relay_tasks.pop(websocket, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def set_subscribed(
+        self, websocket: WebSocket, channels: Iterable[str], subscribed: bool
+    ) -> Set[str]:
+        """
+        Subscribe a client to, or unsubscribe it from, optional message types.
+
+        Types outside OPTIONAL_CHANNELS are ignored. Returns the client's
+        muted types afterwards.
+        """
+        queue = self._send_queues.get(websocket)
+        if queue is None:
+            return set()
+        changed = OPTIONAL_CHANNELS.intersection(channels)
+        if subscribed:
+            queue.muted -= changed
+        else:
+            queue.muted |= changed
+        return set(queue.muted)
+
+    async def _relay(self, websocket: WebSocket, queue: _ClientQueue):
+        """Send one client's queued messages, in order, until it fails."""
+        try:
+            while True:
+                message = await queue.get()
+                await websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(websocket)
+
+    async def _close_slow_client(self, websocket: WebSocket):
+        """Close a client that fell too far behind; the app reconnects."""
+        try:
+            await websocket.close(code=1013)  # try again later
+        except Exception:
+            pass
+
+    def _enqueue(
+        self,
+        websocket: WebSocket,
+        queue: _ClientQueue,
+        message: str,
+        message_type: str | None,
+        content: Any,
+    ):
+        """Queue a message for one client, dropping it if it is too far behind."""
+        if not queue.put(message, message_type, content):
+            print("[WS] Client send queue full; dropping slow client")
+            self.disconnect(websocket)
+            asyncio.create_task(self._close_slow_client(websocket))
 
-    async def broadcast(self, message: str):
+    async def send_to(
+        self,
+        websocket: WebSocket,
+        message: str,
+        message_type: str | None = None,
+        content: Any = None,
+    ):
+        """
+        Send a message to a single client.
+
+        The message is queued like a broadcast, so it reaches the client
+        after anything already queued for it and never races the relay for
+        the socket. Messages for disconnected clients are discarded.
+        """
+        queue = self._send_queues.get(websocket)
+        if queue is None:
+            return
+        self._enqueue(websocket, queue, message, message_type, content)
+        await asyncio.sleep(0)
+
+    async def send_json_to(self, websocket: WebSocket, message_type: str, content: Any):
+        """Send a JSON message with type and content fields to a single client."""
+        message = json.dumps({"type": message_type, "content": content})
+        await self.send_to(websocket, message, message_type, content)
+
+    async def broadcast(
+        self, message: str, message_type: str | None = None, content: Any = None
+    ):
         """
         Broadcast a message to all connected clients.
         
-        Automatically removes disconnected clients.
+        Queues the message for every client without waiting for delivery.
+        message_type and content, when given, let a backed-up client's queue
+        merge streamed chunks (see _ClientQueue). A client that falls too far
+        behind anyway is disconnected rather than allowed to hold messages
+        back for everyone else.
         """
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception:
-                disconnected.append(connection)
-
-        # Remove disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
+        for connection, queue in list(self._send_queues.items()):
+            self._enqueue(connection, queue, message, message_type, content)
+
+        # Let the relays run before the caller queues more, so a tight loop
+        # of broadcasts cannot fill a healthy client's queue
+        await asyncio.sleep(0)
     
     async def broadcast_json(self, message_type: str, content: str):
         """Broadcast a JSON message with type and content fields."""
         message = json.dumps({"type": message_type, "content": content})
-        await self.broadcast(message)
+        await self.broadcast(message, message_type, content)
 
 
 # Global connection manager instance
@@ -5,9 +5,9 @@ Handles startup, shutdown, signal handling, and resource cleanup.
 """
 import sys
 import os
-import glob
 import asyncio
 import signal
+import threading
 import atexit
 
 
@@ -77,16 +77,50 @@ def cleanup_resources():
 
 def _clear_folder(folder_path: str):
     """Clear all files in a folder."""
-    if os.path.exists(folder_path):
-        for file_path in glob.glob(os.path.join(folder_path, "*")):
-            os.remove(file_path)
+    if not os.path.exists(folder_path):
+        return
+
+    # Where supported (Linux, macOS), unlink relative to an open directory fd
+    # so the kernel doesn't re-resolve the folder path for every file
+    dir_fd = None
+    if os.unlink in os.supports_dir_fd and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(folder_path, os.O_RDONLY | os.O_DIRECTORY)
+
+    try:
+        # scandir yields entries without building a list or matching a
+        # pattern; dotfiles are skipped, as the old glob("*") did
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if dir_fd is not None:
+                        os.unlink(entry.name, dir_fd=dir_fd)
+                    else:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass  # removed since the scan listed it
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
 
 
 def signal_handler(signum, frame):
-    """Handle shutdown signals."""
+    """
+    Handle shutdown signals.
+
+    Wakes main()'s keepalive wait via app_state.shutdown_event; main()
+    then runs cleanup_resources() and returns.
+    """
     print(f"Received signal {signum}, shutting down...")
-    cleanup_resources()
-    sys.exit(0)
+    if 'source.core.state' in sys.modules:
+        from source.core.state import app_state
+    else:
+        from .state import app_state
+    # Set from a short-lived thread: the handler runs on the main thread,
+    # which may be holding the event's internal lock inside wait(), and
+    # set() from here would then block forever.
+    threading.Thread(target=app_state.shutdown_event.set, daemon=True).start()
 
 
 def register_signal_handlers():
@@ -49,6 +49,15 @@ class AppState:
         # Chat history for multi-turn conversations
         self.chat_history: List[Dict[str, Any]] = []
 
+        # Provider-formatted history, reused across turns by the cloud
+        # message builders: {provider: (source_messages, formatted_messages)}
+        self.formatted_history_cache: Dict[str, tuple] = {}
+
+        # Chained response-cache digests over chat_history, one
+        # (message, content, images, digest) entry per message; digest covers
+        # chat_history[: i + 1]. Only touched on the event loop (llm/cache.py).
+        self.history_digests: List[tuple] = []
+
         # Current conversation ID for database persistence
         self.conversation_id: Optional[str] = None
 
@@ -60,12 +69,18 @@ class AppState:
 
         # Event loop holder for cross-thread scheduling
         self.server_loop_holder: Dict[str, Any] = {}
+        # Set by the server thread once server_loop_holder is filled in
+        self.server_ready = threading.Event()
+        # Set to let the main thread return from its keepalive wait
+        self.shutdown_event = threading.Event()
 
     def reset_conversation(self):
         """Reset state for a new conversation."""
         self.chat_history = []
         self.conversation_id = None
         self.screenshot_list = []
+        self.formatted_history_cache = {}
+        self.history_digests = []
 
     def add_screenshot(self, screenshot_data: Dict[str, Any]) -> str:
         """Add a screenshot and return its ID."""
@@ -4,6 +4,10 @@ import uuid
 import time
 from typing import List, Dict, Any
 import os
+import threading
+
+# Marks a cached value that has not been read from the database yet.
+_UNSET = object()
 
 
 class DatabaseManager:
@@ -14,6 +18,16 @@ class DatabaseManager:
         """
         os.makedirs(os.path.dirname(database_path), exist_ok=True)
         self.database_path = database_path
+        # Guards the in-memory caches below. Each cache has a generation
+        # counter bumped on every write, so a read that raced a write is
+        # returned but not stored.
+        self._cache_lock = threading.Lock()
+        # Read on every chat turn, so kept in memory and dropped on write
+        self._system_prompt_template: Any = _UNSET
+        self._system_prompt_template_gen = 0
+        # Skill rows are read on every query (slash commands); reset on write
+        self._all_skills: List[Dict] | None = None
+        self._all_skills_gen = 0
         self._init_db()
 
     def _get_connection(self):
@@ -148,6 +162,17 @@ class DatabaseManager:
             )
         """)
 
+        # --- TABLE 6: LLM RESPONSE CACHE ---
+        # Exact-match cache of cloud model responses, keyed by a SHA-256 of
+        # everything sent to the model. Only used when LLM_RESPONSE_CACHE is on.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL
+            )
+        """)
+
         connection.commit()
         connection.close()
 
@@ -461,6 +486,25 @@ class DatabaseManager:
         connection.close()
         return row[0] if row else None
 
+    def get_settings_multi(self, keys: List[str]) -> Dict[str, str]:
+        """
+        Get several raw setting values in one query.
+
+        Returns a dict of key -> value containing only the keys that exist.
+        """
+        if not keys:
+            return {}
+        connection = self._get_connection()
+        cursor = connection.cursor()
+        placeholders = ",".join("?" * len(keys))
+        cursor.execute(
+            f"SELECT key, value FROM settings WHERE key IN ({placeholders})",
+            tuple(keys),
+        )
+        rows = cursor.fetchall()
+        connection.close()
+        return {row[0]: row[1] for row in rows}
+
     def set_setting(self, key: str, value: str):
         """Set a raw setting value (upsert)."""
         connection = self._get_connection()
@@ -470,6 +514,8 @@ class DatabaseManager:
         )
         connection.commit()
         connection.close()
+        if key == "system_prompt_template":
+            self._invalidate_system_prompt_template()
 
     def delete_setting(self, key: str):
         """Delete a setting by key."""
@@ -478,13 +524,31 @@ class DatabaseManager:
         cursor.execute("DELETE FROM settings WHERE key = ?", (key,))
         connection.commit()
         connection.close()
+        if key == "system_prompt_template":
+            self._invalidate_system_prompt_template()
 
     def get_system_prompt_template(self) -> str | None:
         """
         Returns the user-saved system prompt template, or None if not set.
         Caller should fall back to the hardcoded default when None is returned.
         """
-        return self.get_setting("system_prompt_template")
+        with self._cache_lock:
+            cached = self._system_prompt_template
+            gen = self._system_prompt_template_gen
+        if cached is not _UNSET:
+            return cached
+
+        template = self.get_setting("system_prompt_template")
+        with self._cache_lock:
+            if self._system_prompt_template_gen == gen:
+                self._system_prompt_template = template
+        return template
+
+    def _invalidate_system_prompt_template(self) -> None:
+        """Drop the cached template after a write (called once committed)."""
+        with self._cache_lock:
+            self._system_prompt_template = _UNSET
+            self._system_prompt_template_gen += 1
 
     def set_system_prompt_template(self, template: str | None) -> None:
         """
@@ -605,7 +669,17 @@ class DatabaseManager:
     # ---------------------------------------------------------
 
     def get_all_skills(self) -> List[Dict]:
-        """Returns all skill rows."""
+        """
+        Returns all skill rows.
+
+        Rows are copies of the cached ones, so callers may modify them.
+        """
+        with self._cache_lock:
+            cached = self._all_skills
+            gen = self._all_skills_gen
+        if cached is not None:
+            return [dict(skill) for skill in cached]
+
         connection = self._get_connection()
         cursor = connection.cursor()
         cursor.execute(
@@ -615,7 +689,7 @@ class DatabaseManager:
         )
         rows = cursor.fetchall()
         connection.close()
-        return [
+        skills = [
             {
                 "id": r[0],
                 "skill_name": r[1],
@@ -630,6 +704,16 @@ class DatabaseManager:
             }
             for r in rows
         ]
+        with self._cache_lock:
+            if self._all_skills_gen == gen:
+                self._all_skills = skills
+        return [dict(skill) for skill in skills]
+
+    def _invalidate_skills(self) -> None:
+        """Drop the cached skill rows after a write (called once committed)."""
+        with self._cache_lock:
+            self._all_skills = None
+            self._all_skills_gen += 1
 
     def get_skill_by_name(self, skill_name: str) -> Dict | None:
         """Returns a single skill by name, or None."""
@@ -722,6 +806,7 @@ class DatabaseManager:
         )
         connection.commit()
         connection.close()
+        self._invalidate_skills()
 
     def update_skill_content(self, skill_name: str, content: str) -> None:
         """Update skill content and mark as modified."""
@@ -734,6 +819,7 @@ class DatabaseManager:
         )
         connection.commit()
         connection.close()
+        self._invalidate_skills()
 
     def reset_skill_to_default(self, skill_name: str) -> None:
         """Restore a default skill to its original content."""
@@ -750,6 +836,7 @@ class DatabaseManager:
                 )
                 connection.commit()
                 connection.close()
+                self._invalidate_skills()
                 return
 
     def delete_skill(self, skill_name: str) -> bool:
@@ -762,6 +849,7 @@ class DatabaseManager:
         cursor.execute("DELETE FROM skills WHERE skill_name = ?", (skill_name,))
         connection.commit()
         connection.close()
+        self._invalidate_skills()
         return True
 
     def toggle_skill(self, skill_name: str, enabled: bool) -> None:
@@ -774,6 +862,31 @@ class DatabaseManager:
         )
         connection.commit()
         connection.close()
+        self._invalidate_skills()
+
+    # ---------------------------------------------------------
+    # LLM RESPONSE CACHE OPERATIONS
+    # ---------------------------------------------------------
+
+    def get_cached_response(self, key: str) -> str | None:
+        """Returns the cached response text for a cache key, or None."""
+        connection = self._get_connection()
+        cursor = connection.cursor()
+        cursor.execute("SELECT response FROM llm_response_cache WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        connection.close()
+        return row[0] if row else None
+
+    def set_cached_response(self, key: str, response: str) -> None:
+        """Stores (or replaces) the response text for a cache key."""
+        connection = self._get_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO llm_response_cache (key, response, created_at) VALUES (?, ?, ?)",
+            (key, response, time.time()),
+        )
+        connection.commit()
+        connection.close()
 
 
 # Global singleton instance so all modules share the same DB connection logic
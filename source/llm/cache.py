@@ -0,0 +1,133 @@
+"""
+Exact-match cache for cloud LLM responses.
+
+Enabled with XPDITE_LLM_RESPONSE_CACHE=1 (see config.LLM_RESPONSE_CACHE).
+A stored response is reused only when the provider, model, system prompt,
+chat history, query and attached images are all identical. Hits are replayed
+over the WebSocket in small chunks so the UI still sees a stream.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.connection import broadcast_message
+from ..core.state import app_state
+from ..database import db
+
+# Replay pacing for cache hits: characters per chunk and delay between chunks
+_REPLAY_CHUNK_CHARS = 64
+_REPLAY_DELAY_S = 0.005
+
+
+def _image_fingerprint(path: str) -> Tuple[str, Optional[int], Optional[int]]:
+    """Identify an image by path, size and mtime without reading its bytes."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, st.st_size, st.st_mtime_ns)
+
+
+def history_digest(chat_history: List[Dict[str, Any]]) -> str:
+    """
+    Chained SHA-256 over the chat history. Call on the event loop.
+
+    Running digests are kept on app_state.history_digests, one entry per
+    message with the message, content and images objects it covered. They
+    are reused for the longest prefix where all three are still the same
+    objects, so an edited, replaced or resumed history is re-hashed from
+    the first difference and only new messages are hashed on a normal turn.
+    The history entries themselves are never written to.
+    """
+    digests = app_state.history_digests
+    reuse = 0
+    for (old_msg, old_content, old_images, _), msg in zip(digests, chat_history):
+        if (
+            old_msg is not msg
+            or old_content is not msg["content"]
+            or old_images is not msg.get("images")
+        ):
+            break
+        reuse += 1
+    del digests[reuse:]
+
+    digest = digests[-1][3] if digests else b""
+    for msg in chat_history[reuse:]:
+        images = msg.get("images")
+        h = hashlib.sha256(digest)
+        h.update(
+            json.dumps(
+                [msg["role"], msg["content"], images or []],
+                ensure_ascii=False,
+            ).encode("utf-8")
+        )
+        digest = h.digest()
+        digests.append((msg, msg["content"], images, digest))
+    return digest.hex()
+
+
+def _cache_key(
+    provider: str,
+    model: str,
+    system_prompt: str,
+    history: str,
+    user_query: str,
+    image_paths: List[str],
+) -> str:
+    payload = {
+        "provider": provider,
+        "model": model,
+        "system": system_prompt,
+        "history": history,
+        "query": user_query,
+        "images": [_image_fingerprint(p) for p in image_paths],
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def lookup_response(
+    provider: str,
+    model: str,
+    system_prompt: str,
+    history: str,
+    user_query: str,
+    image_paths: List[str],
+) -> Tuple[str, Optional[str]]:
+    """
+    Compute the cache key for a request and look it up. Blocking (SQLite).
+
+    history is history_digest(chat_history), computed beforehand on the
+    event loop. Returns (key, cached_response_or_None).
+    """
+    key = _cache_key(provider, model, system_prompt, history, user_query, image_paths)
+    return key, db.get_cached_response(key)
+
+
+def store_response(key: str, response: str) -> None:
+    """Store a completed response under its cache key. Blocking (SQLite)."""
+    db.set_cached_response(key, response)
+
+
+async def replay_response(response: str) -> tuple[str, Dict[str, int], List[Dict[str, Any]]]:
+    """
+    Broadcast a cached response as if it were streamed.
+
+    Reports zero token usage, since no provider call was made. Returns the
+    same tuple shape as stream_cloud_chat.
+    """
+    for start in range(0, len(response), _REPLAY_CHUNK_CHARS):
+        if app_state.stop_streaming:
+            break
+        await broadcast_message(
+            "response_chunk", response[start : start + _REPLAY_CHUNK_CHARS]
+        )
+        await asyncio.sleep(_REPLAY_DELAY_S)
+
+    token_stats = {"prompt_eval_count": 0, "eval_count": 0}
+    await broadcast_message("response_complete", "")
+    await broadcast_message("token_usage", json.dumps(token_stats))
+    return response, token_stats, []
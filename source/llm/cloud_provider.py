@@ -9,12 +9,16 @@ Same return signature as stream_ollama_chat for drop-in compatibility.
 """
 
 import os
+import asyncio
 import base64
+import io
 import json
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 
 from ..core.connection import broadcast_message
 from ..core.state import app_state
+from ..core.thread_pool import run_in_thread
+from .images import load_image
 
 
 # ---------------------------------------------------------------------------
@@ -22,26 +26,107 @@ from ..core.state import app_state
 # ---------------------------------------------------------------------------
 
 
-def _load_image_as_base64(path: str) -> Optional[str]:
-    """Load an image file and return its base64-encoded content."""
-    try:
-        with open(path, "rb") as f:
-            return base64.standard_b64encode(f.read()).decode("utf-8")
-    except Exception as e:
-        print(f"[Cloud] Failed to load image {path}: {e}")
+def _load_image_as_data_url(path: str) -> Optional[str]:
+    """Return the image as a complete ``data:`` URL, or None if missing."""
+    b64 = load_image(path)
+    if not b64:
         return None
+    return f"data:{_guess_media_type(path)};base64,{b64}"
+
+
+async def _load_images(
+    chat_history: List[Dict[str, Any]],
+    image_paths: List[str],
+    loader: Callable[[str], Optional[str]] = load_image,
+) -> Dict[str, Optional[str]]:
+    """
+    Load every image referenced by the history and the current turn.
+
+    Reads run concurrently on the app thread pool; the message builders
+    then consume the returned {path: loader(path)} map synchronously.
+    """
+    paths = [
+        p
+        for msg in chat_history
+        if msg["role"] == "user" and msg.get("images")
+        for p in msg["images"]
+    ]
+    paths.extend(image_paths)
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+
+    results = await asyncio.gather(*(run_in_thread(loader, p) for p in paths))
+    return dict(zip(paths, results))
+
+
+# formatted_history_cache placeholder for a user message with images. Those
+# are re-formatted every turn, so the cache never holds image data and a
+# deleted image is noticed.
+_WITH_IMAGES = object()
+
+
+async def _format_history(
+    provider: str,
+    chat_history: List[Dict[str, Any]],
+    image_paths: List[str],
+    format_message: Callable[[str, str, Optional[List[str]], Dict[str, Optional[str]]], Any],
+    loader: Callable[[str], Optional[str]] = load_image,
+) -> tuple[list, Dict[str, Optional[str]]]:
+    """
+    Return (provider-formatted history, loaded images for this turn).
+
+    Formatted text-only messages are cached per provider on app_state,
+    aligned with the history entries they came from. Only entries past the
+    longest prefix of identical message objects are re-formatted. Messages
+    with images are formatted afresh each turn from the (stat-checked,
+    lru-cached) image loader.
+    """
+    cached_src, cached = app_state.formatted_history_cache.get(provider, ((), []))
+    reuse = 0
+    for old, new in zip(cached_src, chat_history):
+        if old is not new:
+            break
+        reuse += 1
+
+    entries = cached[:reuse]
+    for msg in chat_history[reuse:]:
+        role = msg["role"]
+        if role == "tool":
+            entries.append(None)
+        elif role == "user" and msg.get("images"):
+            entries.append(_WITH_IMAGES)
+        else:
+            entries.append(format_message(role, msg["content"], None, {}))
+    app_state.formatted_history_cache[provider] = (tuple(chat_history), entries)
+
+    with_images = [
+        msg for msg, entry in zip(chat_history, entries) if entry is _WITH_IMAGES
+    ]
+    images = await _load_images(with_images, image_paths, loader)
+
+    formatted = []
+    for msg, entry in zip(chat_history, entries):
+        if entry is _WITH_IMAGES:
+            entry = format_message("user", msg["content"], msg["images"], images)
+        if entry is not None:
+            formatted.append(entry)
+    return formatted, images
+
+
+_MIME_BY_EXT = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
 
 
 def _guess_media_type(path: str) -> str:
     """Guess the MIME type from a file extension."""
-    ext = os.path.splitext(path)[1].lower()
-    return {
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-    }.get(ext, "image/png")
+    ext = os.path.splitext(path)[1]
+    return _MIME_BY_EXT.get(ext) or _MIME_BY_EXT.get(ext.lower(), "image/png")
 
 
 # ---------------------------------------------------------------------------
@@ -49,64 +134,43 @@ def _guess_media_type(path: str) -> str:
 # ---------------------------------------------------------------------------
 
 
-def _build_anthropic_messages(
+def _anthropic_message(
+    role: str,
+    content: str,
+    image_paths: Optional[List[str]],
+    images: Dict[str, Optional[str]],
+) -> Dict[str, Any]:
+    """Format one message for Anthropic (images maps path -> base64)."""
+    blocks: list = []
+    for img_path in image_paths or ():
+        b64 = images.get(img_path)
+        if b64:
+            blocks.append(
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": _guess_media_type(img_path),
+                        "data": b64,
+                    },
+                }
+            )
+    if not blocks:
+        return {"role": role, "content": content}
+    blocks.append({"type": "text", "text": content})
+    return {"role": role, "content": blocks}
+
+
+async def _build_anthropic_messages(
     chat_history: List[Dict[str, Any]],
     user_query: str,
     image_paths: List[str],
 ) -> List[Dict[str, Any]]:
-    """Convert chat history to Anthropic message format."""
-    messages = []
-
-    for msg in chat_history:
-        role = msg["role"]
-        content = msg["content"]
-
-        if role == "tool":
-            continue
-
-        if role == "user" and msg.get("images"):
-            blocks: list = []
-            for img_path in msg["images"]:
-                if os.path.exists(img_path):
-                    b64 = _load_image_as_base64(img_path)
-                    if b64:
-                        blocks.append(
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": _guess_media_type(img_path),
-                                    "data": b64,
-                                },
-                            }
-                        )
-            blocks.append({"type": "text", "text": content})
-            messages.append({"role": "user", "content": blocks})
-        else:
-            messages.append({"role": role, "content": content})
-
-    # Add current user message
-    existing_images = [p for p in image_paths if os.path.exists(p)]
-    if existing_images:
-        blocks = []
-        for img_path in existing_images:
-            b64 = _load_image_as_base64(img_path)
-            if b64:
-                blocks.append(
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": _guess_media_type(img_path),
-                            "data": b64,
-                        },
-                    }
-                )
-        blocks.append({"type": "text", "text": user_query})
-        messages.append({"role": "user", "content": blocks})
-    else:
-        messages.append({"role": "user", "content": user_query})
-
+    """Convert chat history + current query to Anthropic message format."""
+    messages, images = await _format_history(
+        "anthropic", chat_history, image_paths, _anthropic_message
+    )
+    messages.append(_anthropic_message("user", user_query, image_paths, images))
     return messages
 
 
@@ -122,9 +186,10 @@ async def _stream_anthropic(
     """Stream a response from Anthropic's Claude API using native async streaming."""
     import anthropic
 
-    messages = _build_anthropic_messages(chat_history, user_query, image_paths)
+    messages = await _build_anthropic_messages(chat_history, user_query, image_paths)
     tool_calls_list: List[Dict[str, Any]] = []
-    accumulated: list[str] = []
+    accumulated = io.StringIO()
+    has_text = False
     thinking_tokens: list[str] = []
     token_stats: Dict[str, int] = {"prompt_eval_count": 0, "eval_count": 0}
 
@@ -154,42 +219,52 @@ async def _stream_anthropic(
             create_kwargs["tools"] = tools
 
         async with client.messages.stream(**create_kwargs) as stream:
-            async for event in stream:
-                if app_state.stop_streaming:
-                    break
-
-                if event.type == "content_block_start":
-                    block = event.content_block
-                    if hasattr(block, "type"):
-                        if block.type == "text" and thinking_tokens and not accumulated:
+            if not is_thinking_model and not tools:
+                # Text-only fast path: the SDK yields plain strings, so we
+                # skip dispatching on every event object.
+                async for text in stream.text_stream:
+                    if app_state.stop_streaming:
+                        break
+                    accumulated.write(text)
+                    has_text = True
+                    await broadcast_message("response_chunk", text)
+            else:
+                async for event in stream:
+                    if app_state.stop_streaming:
+                        break
+
+                    if event.type == "content_block_start":
+                        block_type = getattr(event.content_block, "type", None)
+                        if block_type == "text" and thinking_tokens and not has_text:
                             await broadcast_message("thinking_complete", "")
 
-                elif event.type == "content_block_delta":
-                    delta = event.delta
-                    if hasattr(delta, "type"):
-                        if delta.type == "thinking_delta":
+                    elif event.type == "content_block_delta":
+                        delta = event.delta
+                        delta_type = getattr(delta, "type", None)
+                        if delta_type == "thinking_delta":
                             thinking_tokens.append(delta.thinking)
                             await broadcast_message("thinking_chunk", delta.thinking)
-                        elif delta.type == "text_delta":
-                            if thinking_tokens and not accumulated:
+                        elif delta_type == "text_delta":
+                            if thinking_tokens and not has_text:
                                 await broadcast_message("thinking_complete", "")
-                            accumulated.append(delta.text)
+                            accumulated.write(delta.text)
+                            has_text = True
                             await broadcast_message("response_chunk", delta.text)
 
             # Get final message for token stats
             final_message = await stream.get_final_message()
-            if final_message and hasattr(final_message, "usage"):
-                usage = final_message.usage
-                token_stats["prompt_eval_count"] = getattr(usage, "input_tokens", 0)
-                token_stats["eval_count"] = getattr(usage, "output_tokens", 0)
+            usage = getattr(final_message, "usage", None) if final_message else None
+            if usage is not None:
+                token_stats["prompt_eval_count"] = getattr(usage, "input_tokens", 0) or 0
+                token_stats["eval_count"] = getattr(usage, "output_tokens", 0) or 0
 
-        if thinking_tokens and not accumulated:
+        if thinking_tokens and not has_text:
             await broadcast_message("thinking_complete", "")
 
         await broadcast_message("response_complete", "")
         await broadcast_message("token_usage", json.dumps(token_stats))
 
-        return "".join(accumulated), token_stats, tool_calls_list
+        return accumulated.getvalue(), token_stats, tool_calls_list
 
     except Exception as e:
         err = f"Error streaming from Anthropic: {e}"
@@ -203,62 +278,37 @@ async def _stream_anthropic(
 # ---------------------------------------------------------------------------
 
 
-def _build_openai_messages(
+def _openai_message(
+    role: str,
+    content: str,
+    image_paths: Optional[List[str]],
+    images: Dict[str, Optional[str]],
+) -> Dict[str, Any]:
+    """Format one message for OpenAI (images maps path -> data URL)."""
+    parts: list = []
+    for img_path in image_paths or ():
+        url = images.get(img_path)
+        if url:
+            parts.append({"type": "image_url", "image_url": {"url": url}})
+    if not parts:
+        return {"role": role, "content": content}
+    parts.append({"type": "text", "text": content})
+    return {"role": role, "content": parts}
+
+
+async def _build_openai_messages(
     chat_history: List[Dict[str, Any]],
     user_query: str,
     image_paths: List[str],
+    system_prompt: str = "",
 ) -> List[Dict[str, Any]]:
-    """Convert chat history to OpenAI message format."""
-    messages = []
-
-    for msg in chat_history:
-        role = msg["role"]
-        content = msg["content"]
-
-        if role == "tool":
-            continue
-
-        if role == "user" and msg.get("images"):
-            parts: list = []
-            for img_path in msg["images"]:
-                if os.path.exists(img_path):
-                    b64 = _load_image_as_base64(img_path)
-                    if b64:
-                        media_type = _guess_media_type(img_path)
-                        parts.append(
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{media_type};base64,{b64}",
-                                },
-                            }
-                        )
-            parts.append({"type": "text", "text": content})
-            messages.append({"role": "user", "content": parts})
-        else:
-            messages.append({"role": role, "content": content})
-
-    # Current user message
-    existing_images = [p for p in image_paths if os.path.exists(p)]
-    if existing_images:
-        parts = []
-        for img_path in existing_images:
-            b64 = _load_image_as_base64(img_path)
-            if b64:
-                media_type = _guess_media_type(img_path)
-                parts.append(
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:{media_type};base64,{b64}",
-                        },
-                    }
-                )
-        parts.append({"type": "text", "text": user_query})
-        messages.append({"role": "user", "content": parts})
-    else:
-        messages.append({"role": "user", "content": user_query})
-
+    """Convert chat history + current query to OpenAI message format."""
+    history, images = await _format_history(
+        "openai", chat_history, image_paths, _openai_message, _load_image_as_data_url
+    )
+    messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    messages.extend(history)
+    messages.append(_openai_message("user", user_query, image_paths, images))
     return messages
 
 
@@ -274,11 +324,12 @@ async def _stream_openai(
     """Stream a response from OpenAI's API using native async streaming."""
     from openai import AsyncOpenAI
 
-    messages = _build_openai_messages(chat_history, user_query, image_paths)
-    if system_prompt:
-        messages.insert(0, {"role": "system", "content": system_prompt})
+    messages = await _build_openai_messages(
+        chat_history, user_query, image_paths, system_prompt
+    )
     tool_calls_list: List[Dict[str, Any]] = []
-    accumulated: list[str] = []
+    accumulated = io.StringIO()
+    has_text = False
     thinking_tokens: list[str] = []
     token_stats: Dict[str, int] = {"prompt_eval_count": 0, "eval_count": 0}
 
@@ -304,13 +355,12 @@ async def _stream_openai(
             if app_state.stop_streaming:
                 break
 
-            if not chunk.choices and hasattr(chunk, "usage") and chunk.usage:
-                # Final chunk with usage stats
-                token_stats["prompt_eval_count"] = chunk.usage.prompt_tokens or 0
-                token_stats["eval_count"] = chunk.usage.completion_tokens or 0
-                continue
-
             if not chunk.choices:
+                usage = getattr(chunk, "usage", None)
+                if usage:
+                    # Final chunk with usage stats
+                    token_stats["prompt_eval_count"] = usage.prompt_tokens or 0
+                    token_stats["eval_count"] = usage.completion_tokens or 0
                 continue
 
             delta = chunk.choices[0].delta
@@ -323,18 +373,19 @@ async def _stream_openai(
 
             # Handle regular content
             if delta.content:
-                if thinking_tokens and not accumulated:
+                if thinking_tokens and not has_text:
                     await broadcast_message("thinking_complete", "")
-                accumulated.append(delta.content)
+                accumulated.write(delta.content)
+                has_text = True
                 await broadcast_message("response_chunk", delta.content)
 
-        if thinking_tokens and not accumulated:
+        if thinking_tokens and not has_text:
             await broadcast_message("thinking_complete", "")
 
         await broadcast_message("response_complete", "")
         await broadcast_message("token_usage", json.dumps(token_stats))
 
-        return "".join(accumulated), token_stats, tool_calls_list
+        return accumulated.getvalue(), token_stats, tool_calls_list
 
     except Exception as e:
         err = f"Error streaming from OpenAI: {e}"
@@ -348,73 +399,42 @@ async def _stream_openai(
 # ---------------------------------------------------------------------------
 
 
-def _build_gemini_contents(
-    chat_history: List[Dict[str, Any]],
-    user_query: str,
-    image_paths: List[str],
-) -> list:
-    """Convert chat history to Gemini content format."""
+def _gemini_content(
+    role: str,
+    content: str,
+    image_paths: Optional[List[str]],
+    images: Dict[str, Optional[str]],
+):
+    """Format one message as a Gemini Content (images maps path -> base64)."""
     from google.genai import types
 
-    contents = []
-
-    for msg in chat_history:
-        role = msg["role"]
-        content = msg["content"]
-
-        if role == "tool":
-            continue
-
-        # Gemini uses "user" and "model" roles
-        gemini_role = "model" if role == "assistant" else "user"
-
-        if role == "user" and msg.get("images"):
-            parts = []
-            for img_path in msg["images"]:
-                if os.path.exists(img_path):
-                    b64 = _load_image_as_base64(img_path)
-                    if b64:
-                        media_type = _guess_media_type(img_path)
-                        parts.append(
-                            types.Part.from_bytes(
-                                data=base64.standard_b64decode(b64),
-                                mime_type=media_type,
-                            )
-                        )
-            parts.append(types.Part.from_text(text=content))
-            contents.append(types.Content(role=gemini_role, parts=parts))
-        else:
-            contents.append(
-                types.Content(
-                    role=gemini_role,
-                    parts=[types.Part.from_text(text=content)],
+    parts = []
+    for img_path in image_paths or ():
+        b64 = images.get(img_path)
+        if b64:
+            parts.append(
+                types.Part.from_bytes(
+                    data=base64.standard_b64decode(b64),
+                    mime_type=_guess_media_type(img_path),
                 )
             )
+    parts.append(types.Part.from_text(text=content))
+
+    # Gemini uses "user" and "model" roles
+    gemini_role = "model" if role == "assistant" else "user"
+    return types.Content(role=gemini_role, parts=parts)
 
-    # Current user message
-    existing_images = [p for p in image_paths if os.path.exists(p)]
-    if existing_images:
-        parts = []
-        for img_path in existing_images:
-            b64 = _load_image_as_base64(img_path)
-            if b64:
-                media_type = _guess_media_type(img_path)
-                parts.append(
-                    types.Part.from_bytes(
-                        data=base64.standard_b64decode(b64),
-                        mime_type=media_type,
-                    )
-                )
-        parts.append(types.Part.from_text(text=user_query))
-        contents.append(types.Content(role="user", parts=parts))
-    else:
-        contents.append(
-            types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=user_query)],
-            )
-        )
 
+async def _build_gemini_contents(
+    chat_history: List[Dict[str, Any]],
+    user_query: str,
+    image_paths: List[str],
+) -> list:
+    """Convert chat history + current query to Gemini content format."""
+    contents, images = await _format_history(
+        "gemini", chat_history, image_paths, _gemini_content
+    )
+    contents.append(_gemini_content("user", user_query, image_paths, images))
     return contents
 
 
@@ -431,9 +451,10 @@ async def _stream_gemini(
     from google import genai
     from google.genai import types
 
-    contents = _build_gemini_contents(chat_history, user_query, image_paths)
+    contents = await _build_gemini_contents(chat_history, user_query, image_paths)
     tool_calls_list: List[Dict[str, Any]] = []
-    accumulated: list[str] = []
+    accumulated = io.StringIO()
+    has_text = False
     thinking_tokens: list[str] = []
     token_stats: Dict[str, int] = {"prompt_eval_count": 0, "eval_count": 0}
 
@@ -462,6 +483,7 @@ async def _stream_gemini(
         )
 
         # Use the async API for streaming
+        usage_metadata = None
         async for chunk in await client.aio.models.generate_content_stream(
             model=model,
             contents=contents,
@@ -470,16 +492,12 @@ async def _stream_gemini(
             if app_state.stop_streaming:
                 break
 
+            # Usage is cumulative — keep the latest and read it once at the end
+            um = getattr(chunk, "usage_metadata", None)
+            if um:
+                usage_metadata = um
+
             if not chunk.candidates:
-                # Check for usage metadata
-                if hasattr(chunk, "usage_metadata") and chunk.usage_metadata:
-                    um = chunk.usage_metadata
-                    token_stats["prompt_eval_count"] = (
-                        getattr(um, "prompt_token_count", 0) or 0
-                    )
-                    token_stats["eval_count"] = (
-                        getattr(um, "candidates_token_count", 0) or 0
-                    )
                 continue
 
             candidate = chunk.candidates[0]
@@ -487,33 +505,33 @@ async def _stream_gemini(
                 continue
 
             for part in candidate.content.parts:
+                text = getattr(part, "text", None)
                 # Handle thinking parts
-                if hasattr(part, "thought") and part.thought:
-                    thinking_tokens.append(part.text)
-                    await broadcast_message("thinking_chunk", part.text)
-                elif hasattr(part, "text") and part.text:
-                    if thinking_tokens and not accumulated:
+                if getattr(part, "thought", None):
+                    thinking_tokens.append(text)
+                    await broadcast_message("thinking_chunk", text)
+                elif text:
+                    if thinking_tokens and not has_text:
                         await broadcast_message("thinking_complete", "")
-                    accumulated.append(part.text)
-                    await broadcast_message("response_chunk", part.text)
-
-            # Check usage metadata on each chunk
-            if hasattr(chunk, "usage_metadata") and chunk.usage_metadata:
-                um = chunk.usage_metadata
-                token_stats["prompt_eval_count"] = (
-                    getattr(um, "prompt_token_count", 0) or 0
-                )
-                token_stats["eval_count"] = (
-                    getattr(um, "candidates_token_count", 0) or 0
-                )
+                    accumulated.write(text)
+                    has_text = True
+                    await broadcast_message("response_chunk", text)
+
+        if usage_metadata is not None:
+            token_stats["prompt_eval_count"] = (
+                getattr(usage_metadata, "prompt_token_count", 0) or 0
+            )
+            token_stats["eval_count"] = (
+                getattr(usage_metadata, "candidates_token_count", 0) or 0
+            )
 
-        if thinking_tokens and not accumulated:
+        if thinking_tokens and not has_text:
             await broadcast_message("thinking_complete", "")
 
         await broadcast_message("response_complete", "")
         await broadcast_message("token_usage", json.dumps(token_stats))
 
-        return "".join(accumulated), token_stats, tool_calls_list
+        return accumulated.getvalue(), token_stats, tool_calls_list
 
     except Exception as e:
         err = f"Error streaming from Gemini: {e}"
@@ -527,6 +545,36 @@ async def _stream_gemini(
 # ---------------------------------------------------------------------------
 
 
+async def broadcast_tool_final_response(
+    pre_computed: Dict[str, Any],
+    tool_calls_list: List[Dict[str, Any]],
+) -> tuple[str, Dict[str, int], List[Dict[str, Any]]]:
+    """
+    Broadcast the answer a cloud tool loop already ended on.
+
+    The loop's last (non-streamed) call returned the final response, so it
+    is sent as-is rather than asking the model for it a second time. Same
+    return signature as stream_cloud_chat.
+    """
+    thinking = pre_computed.get("thinking", "")
+    content = pre_computed.get("content", "")
+    token_stats = pre_computed.get(
+        "token_stats", {"prompt_eval_count": 0, "eval_count": 0}
+    )
+
+    if thinking:
+        await broadcast_message("thinking_chunk", thinking)
+        await broadcast_message("thinking_complete", "")
+
+    if content:
+        await broadcast_message("response_chunk", content)
+
+    await broadcast_message("response_complete", "")
+    await broadcast_message("token_usage", json.dumps(token_stats))
+
+    return content, token_stats, tool_calls_list
+
+
 async def stream_cloud_chat(
     provider: str,
     model: str,
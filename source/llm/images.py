@@ -0,0 +1,52 @@
+"""
+Image loading shared by the LLM providers.
+
+Images are returned base64-encoded and cached on (path, mtime, size), so
+screenshots referenced by chat history are not re-read from disk on every
+turn while edited files are still picked up.
+"""
+
+import base64
+import functools
+import os
+from typing import Optional
+
+
+def load_image_as_base64(path: str, size: int = -1) -> Optional[str]:
+    """
+    Load an image file and return its base64-encoded content.
+
+    When the file size is known the bytes are read into a single
+    preallocated buffer instead of growing one chunk at a time.
+    """
+    try:
+        with open(path, "rb") as f:
+            if size < 0:
+                data = f.read()
+            else:
+                buf = bytearray(size)
+                data = memoryview(buf)[: f.readinto(buf)]
+            return base64.standard_b64encode(data).decode("ascii")
+    except Exception as e:
+        print(f"[Images] Failed to load image {path}: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=16)
+def load_image_cached(path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """Base64 cache keyed on (path, mtime, size) so edited files are re-read."""
+    return load_image_as_base64(path, size)
+
+
+def load_image(path: str) -> Optional[str]:
+    """
+    Return the base64 content of an image, or None if it is missing.
+
+    A single os.stat() both checks existence and keys the cache, so history
+    images are not re-read from disk on every turn.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return load_image_cached(path, st.st_mtime_ns, st.st_size)
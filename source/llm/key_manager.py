@@ -9,8 +9,10 @@ from machine-specific data + a random per-install salt.
 import os
 import hashlib
 import base64
+import functools
 import getpass
 import socket
+import threading
 from typing import Optional
 
 from cryptography.fernet import Fernet, InvalidToken
@@ -20,6 +22,43 @@ from cryptography.fernet import Fernet, InvalidToken
 VALID_PROVIDERS = ("anthropic", "openai", "gemini")
 
 
+@functools.lru_cache(maxsize=1)
+def _machine_material() -> bytes:
+    """
+    Machine-specific key material (username, hostname, install path).
+
+    Cached because it cannot change while the process is running and
+    gethostname() may block on some network configurations.
+    """
+    username = getpass.getuser()
+    hostname = socket.gethostname()
+    app_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return f"{username}:{hostname}:{app_path}".encode("utf-8")
+
+
+# Key-derivation versions. v1 (SHA-256) is kept so keys saved by earlier
+# installs still decrypt; installs created after v2 was introduced use BLAKE2b.
+KDF_SHA256 = 1
+KDF_BLAKE2B = 2
+
+
+def _derive_fernet(salt_hex: str, kdf_version: int = KDF_SHA256) -> Fernet:
+    """
+    Derive a Fernet instance from machine-specific data + salt.
+
+    Hashes the combined material to 32 bytes (SHA-256 for v1, BLAKE2b for
+    v2), then base64-encodes the digest to produce a valid Fernet key.
+    """
+    data = bytes.fromhex(salt_hex) + _machine_material()
+    if kdf_version == KDF_BLAKE2B:
+        digest = hashlib.blake2b(data, digest_size=32).digest()
+    else:
+        digest = hashlib.sha256(data).digest()
+
+    # Fernet requires a 32-byte key, base64url-encoded
+    return Fernet(base64.urlsafe_b64encode(digest))
+
+
 class KeyManager:
     """
     Manages API key encryption and decryption using Fernet.
@@ -35,50 +74,53 @@ class KeyManager:
     """
 
     def __init__(self):
+        # Guards _fernet's initialization and the plaintext cache: keys are
+        # read from the thread pool (chat routing) and from HTTP handlers.
+        # The generation counter is bumped on every save/delete, so a read
+        # that raced a write is returned but not stored.
+        self._cache_lock = threading.Lock()
         self._fernet: Optional[Fernet] = None
-        self._initialized = False
+        # Decrypted keys by provider; invalidated by save/delete.
+        self._plaintext_cache: dict[str, Optional[str]] = {}
+        self._plaintext_cache_gen = 0
+
+    def _get_or_create_salt(self) -> tuple[bytes, int]:
+        """
+        Get the per-install salt and KDF version from DB, creating them if needed.
 
-    def _get_or_create_salt(self) -> bytes:
-        """Get the per-install salt from DB, or create one if it doesn't exist."""
+        Installs that stored a salt before the version setting existed are v1.
+        """
         from ..database import db
 
-        salt_hex = db.get_setting("encryption_salt")
+        rows = db.get_settings_multi(["encryption_salt", "kdf_version"])
+        salt_hex = rows.get("encryption_salt")
         if salt_hex:
-            return bytes.fromhex(salt_hex)
+            return bytes.fromhex(salt_hex), int(rows.get("kdf_version") or KDF_SHA256)
 
         # Generate a random 32-byte salt
         salt = os.urandom(32)
+        db.set_setting("kdf_version", str(KDF_BLAKE2B))
         db.set_setting("encryption_salt", salt.hex())
-        return salt
-
-    def _derive_key(self, salt: bytes) -> bytes:
-        """
-        Derive a Fernet-compatible key from machine-specific data + salt.
-
-        Uses SHA-256 to hash the combined material, then base64-encodes
-        the 32-byte digest to produce a valid Fernet key.
-        """
-        # Gather machine-specific material
-        username = getpass.getuser()
-        hostname = socket.gethostname()
-        app_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-        # Combine and hash
-        material = f"{username}:{hostname}:{app_path}".encode("utf-8")
-        digest = hashlib.sha256(salt + material).digest()
-
-        # Fernet requires a 32-byte key, base64url-encoded
-        return base64.urlsafe_b64encode(digest)
+        return salt, KDF_BLAKE2B
 
     def _ensure_initialized(self):
         """Lazily initialize the Fernet instance."""
-        if self._initialized:
+        if self._fernet is not None:
             return
 
-        salt = self._get_or_create_salt()
-        key = self._derive_key(salt)
-        self._fernet = Fernet(key)
-        self._initialized = True
+        with self._cache_lock:
+            if self._fernet is None:
+                salt, kdf_version = self._get_or_create_salt()
+                self._fernet = _derive_fernet(salt.hex(), kdf_version)
+
+    def warm_up(self):
+        """
+        Load the salt and derive the Fernet key ahead of the first request.
+
+        Called once at server startup so the first settings/API call does
+        not pay for the DB read and key derivation.
+        """
+        self._ensure_initialized()
 
     def encrypt_key(self, plaintext: str) -> str:
         """Encrypt an API key. Returns a base64-encoded encrypted string."""
@@ -96,8 +138,8 @@ class KeyManager:
         try:
             decrypted = self._fernet.decrypt(ciphertext.encode("utf-8"))
             return decrypted.decode("utf-8")
-        except (InvalidToken, Exception) as e:
-            print(f"[KeyManager] Decryption failed: {e}")
+        except InvalidToken:
+            print("[KeyManager] Decryption failed: invalid token")
             return None
 
     @staticmethod
@@ -119,19 +161,28 @@ class KeyManager:
 
         encrypted = self.encrypt_key(plaintext_key)
         db.set_setting(f"api_key_{provider}", encrypted)
+        with self._cache_lock:
+            self._plaintext_cache[provider] = plaintext_key
+            self._plaintext_cache_gen += 1
 
     def get_api_key(self, provider: str) -> Optional[str]:
         """Retrieve and decrypt an API key for a provider. Returns None if not stored."""
         if provider not in VALID_PROVIDERS:
             return None
 
+        with self._cache_lock:
+            if provider in self._plaintext_cache:
+                return self._plaintext_cache[provider]
+            gen = self._plaintext_cache_gen
+
         from ..database import db
 
         encrypted = db.get_setting(f"api_key_{provider}")
-        if not encrypted:
-            return None
-
-        return self.decrypt_key(encrypted)
+        key = self.decrypt_key(encrypted) if encrypted else None
+        with self._cache_lock:
+            if self._plaintext_cache_gen == gen:
+                self._plaintext_cache[provider] = key
+        return key
 
     def delete_api_key(self, provider: str):
         """Remove a stored API key for a provider."""
@@ -141,15 +192,38 @@ class KeyManager:
         from ..database import db
 
         db.delete_setting(f"api_key_{provider}")
+        with self._cache_lock:
+            self._plaintext_cache.pop(provider, None)
+            self._plaintext_cache_gen += 1
 
     def get_api_key_status(self) -> dict:
         """
         Get status of all provider API keys.
         Returns {provider: {has_key: bool, masked: str|None}} for each provider.
         """
+        with self._cache_lock:
+            keys = {
+                p: self._plaintext_cache[p]
+                for p in VALID_PROVIDERS
+                if p in self._plaintext_cache
+            }
+            gen = self._plaintext_cache_gen
+
+        missing = [p for p in VALID_PROVIDERS if p not in keys]
+        if missing:
+            from ..database import db
+
+            rows = db.get_settings_multi([f"api_key_{p}" for p in missing])
+            for provider in missing:
+                encrypted = rows.get(f"api_key_{provider}")
+                keys[provider] = self.decrypt_key(encrypted) if encrypted else None
+            with self._cache_lock:
+                if self._plaintext_cache_gen == gen:
+                    self._plaintext_cache.update((p, keys[p]) for p in missing)
+
         status = {}
         for provider in VALID_PROVIDERS:
-            key = self.get_api_key(provider)
+            key = keys[provider]
             if key:
                 status[provider] = {
                     "has_key": True,
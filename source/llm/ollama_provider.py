@@ -4,55 +4,186 @@ Ollama LLM streaming integration.
 Handles streaming responses from Ollama with real-time token broadcasting.
 """
 
+import base64
+import functools
+import io
 import os
 import threading
+import time
 import asyncio
 import json
-from typing import List, Dict, Any, Optional
+import concurrent.futures
+from collections import deque
+from typing import Callable, List, Dict, Any, Optional
 
-from ollama import chat
+from ollama import Client
+from PIL import Image
 
+from ..config import OLLAMA_KEEP_ALIVE
 from ..core.connection import broadcast_message
 from ..core.state import app_state
+from ..core.thread_pool import run_in_thread
 from ..mcp_integration.handlers import handle_mcp_tool_calls
 from ..mcp_integration.manager import mcp_manager
+from .images import load_image_cached
+
+# Streamed tokens are coalesced into one broadcast per this many tokens or
+# this many seconds, whichever comes first.
+_FLUSH_MAX_TOKENS = 16
+_FLUSH_INTERVAL_S = 0.016
+
+# Message types whose queued contents can be concatenated into one broadcast.
+_MERGEABLE_TYPES = frozenset(("response_chunk", "thinking_chunk"))
+
+# Most broadcasts the producer may queue ahead of the sender before it blocks.
+_MAX_PENDING_BROADCASTS = 512
+
+# PNG screenshots at least this large are sent to Ollama re-encoded as JPEG,
+# which is several times smaller over HTTP and faster for the server to decode.
+_JPEG_MIN_BYTES = 256 * 1024
+_JPEG_QUALITY = 85
+
+# One client for the process so its HTTP connection to Ollama stays open
+# between requests. Streaming and the fallback call both go through it.
+_client = Client()
+
+# Streams hold a thread for their whole duration, so they get their own pool
+# rather than tying up workers in the shared app pool (core.thread_pool).
+_STREAM_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="ollama-stream"
+)
+
+# Options sent with every chat call. Shared, so callers must not mutate it.
+_BASE_OPTIONS: Dict[str, Any] = {"num_ctx": 32768}
+
+# Fixed chat kwargs for the streaming call and its non-streamed fallback;
+# only model and messages are filled in per request.
+_STREAM_CHAT_KWARGS: Dict[str, Any] = {
+    "stream": True,
+    "options": _BASE_OPTIONS,
+    "keep_alive": OLLAMA_KEEP_ALIVE,
+}
+_FALLBACK_CHAT_KWARGS: Dict[str, Any] = {**_STREAM_CHAT_KWARGS, "stream": False}
 
 
 def _build_messages(
     chat_history: List[Dict[str, Any]],
     user_query: str,
     image_paths: List[str],
+    system_prompt: str = "",
 ) -> List[Dict[str, Any]]:
-    """Build the messages list from chat history + current user query."""
-    messages = []
+    """
+    Build the messages list from system prompt + chat history + current user query.
+
+    Image paths are copied as-is; _inline_images drops missing files when it
+    loads them, so existence is checked fresh on every request.
+    """
+    messages: List[Dict[str, Any]] = (
+        [{"role": "system", "content": system_prompt}] if system_prompt else []
+    )
     for msg in chat_history:
         message_data = {
             "role": msg["role"],
             "content": msg["content"],
         }
         if msg.get("images"):
-            existing_images = [p for p in msg["images"] if os.path.exists(p)]
-            if existing_images:
-                message_data["images"] = existing_images
+            message_data["images"] = list(msg["images"])
         messages.append(message_data)
 
-    existing_image_paths = [p for p in image_paths if os.path.exists(p)]
     user_msg: Dict[str, Any] = {"role": "user", "content": user_query}
-    if existing_image_paths:
-        user_msg["images"] = existing_image_paths
+    if image_paths:
+        user_msg["images"] = list(image_paths)
     messages.append(user_msg)
 
     return messages
 
 
+@functools.lru_cache(maxsize=1)
+def _nv_codec() -> Optional[tuple]:
+    """
+    (nvimagecodec, decoder, encoder) for GPU JPEG re-encoding, or None.
+
+    nvImageCodec is optional. It is imported and its CUDA-backed codecs
+    created on the first large-PNG re-encode rather than at import, so
+    text-only sessions never pay for it.
+    """
+    try:
+        from nvidia import nvimagecodec
+
+        return nvimagecodec, nvimagecodec.Decoder(), nvimagecodec.Encoder()
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=16)
+def _load_image_as_jpeg(path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """Base64 JPEG re-encoding of an image, cached on (path, mtime, size)."""
+    codec = _nv_codec()
+    if codec is not None:
+        nvimagecodec, decoder, encoder = codec
+        try:
+            data = encoder.encode(
+                decoder.read(path),
+                "jpeg",
+                params=nvimagecodec.EncodeParams(quality=_JPEG_QUALITY),
+            )
+            return base64.standard_b64encode(data).decode("ascii")
+        except Exception as e:
+            print(f"[Ollama] GPU re-encode failed for {path}, using PIL: {e}")
+
+    try:
+        with Image.open(path) as img:
+            buf = io.BytesIO()
+            img.convert("RGB").save(buf, format="JPEG", quality=_JPEG_QUALITY)
+    except Exception as e:
+        print(f"[Ollama] Failed to re-encode image {path}: {e}")
+        return None
+    return base64.standard_b64encode(buf.getbuffer()).decode("ascii")
+
+
+def _load_image_for_ollama(path: str) -> Optional[str]:
+    """Return an image as base64, large PNGs as JPEG; None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_size >= _JPEG_MIN_BYTES and path.lower().endswith(".png"):
+        b64 = _load_image_as_jpeg(path, st.st_mtime_ns, st.st_size)
+        if b64:
+            return b64
+    return load_image_cached(path, st.st_mtime_ns, st.st_size)
+
+
+def _inline_images(messages: List[Dict[str, Any]]) -> None:
+    """
+    Replace image paths with base64 content, in place. Blocking (disk I/O).
+
+    Missing files are dropped, and a message left with no images loses the
+    key. Only the built message dicts are touched, never chat history.
+
+    Given paths, the Ollama client re-reads and re-encodes every image on
+    every request. Loads are cached on (path, mtime, size), so each
+    screenshot is read once across turns.
+    """
+    for msg in messages:
+        paths = msg.get("images")
+        if paths:
+            images = [b64 for b64 in map(_load_image_for_ollama, paths) if b64]
+            if images:
+                msg["images"] = images
+            else:
+                del msg["images"]
+
+
 async def stream_ollama_chat(
     user_query: str, image_paths: List[str], chat_history: List[Dict[str, Any]], system_prompt: str = ""
 ) -> tuple[str, Dict[str, int], List[Dict[str, Any]]]:
     """
     Stream Ollama response without blocking the event loop.
 
-    A background thread iterates the blocking Ollama generator and schedules
-    WebSocket broadcasts for each incremental token. Returns a tuple of
+    A worker from the stream thread pool iterates the blocking Ollama generator
+    and hands batched tokens to a sender task that broadcasts them over the
+    WebSocket. Returns a tuple of
     (full_output_text, token_stats_dict, tool_calls_list) once streaming completes.
 
     Args:
@@ -66,9 +197,8 @@ async def stream_ollama_chat(
     loop = asyncio.get_running_loop()
 
     # Build messages
-    messages = _build_messages(chat_history, user_query, image_paths)
-    if system_prompt:
-        messages.insert(0, {"role": "system", "content": system_prompt})
+    messages = _build_messages(chat_history, user_query, image_paths, system_prompt)
+    await run_in_thread(_inline_images, messages)
 
     # ── MCP Tool Calling Phase (runs on the event loop, not in producer thread) ──
     tool_calls_list: List[Dict[str, Any]] = []
@@ -80,7 +210,7 @@ async def stream_ollama_chat(
                 updated_messages,
                 tool_calls_list,
                 pre_computed_response,
-            ) = await handle_mcp_tool_calls(messages.copy(), image_paths)
+            ) = await handle_mcp_tool_calls(messages, image_paths)
             messages = updated_messages
         except Exception as e:
             print(f"[MCP] Tool calling phase failed: {e}")
@@ -102,18 +232,72 @@ async def stream_ollama_chat(
     # delivery and thinking support. Don't pass tools — they're handled above.
     should_pass_tools = False
 
-    done_future: asyncio.Future[tuple[str, Dict[str, int], List[Dict[str, Any]]]] = (
-        loop.create_future()
-    )
-
-    def safe_schedule(coro):
+    # All broadcasts from the producer thread go through one deque drained by
+    # a single sender task. The producer only touches the loop to wake the
+    # sender when it is idle, rather than once per message. None ends it.
+    pending: deque[tuple[str, str] | None] = deque()
+    pending_lock = threading.Lock()
+    wakeup = asyncio.Event()
+    sender_idle = False
+
+    # Bounds the backlog: a slow client throttles the producer (and with it
+    # the Ollama generator) instead of letting pending messages pile up.
+    slots = threading.BoundedSemaphore(_MAX_PENDING_BROADCASTS)
+    sender_gone = threading.Event()
+
+    async def sender():
+        nonlocal sender_idle
+        try:
+            while True:
+                while pending:
+                    item = pending.popleft()
+                    if item is None:
+                        return
+                    slots.release()
+                    message_type, content = item
+                    # If the sender fell behind, send queued chunks of the
+                    # same kind as one message
+                    if message_type in _MERGEABLE_TYPES:
+                        parts = [content]
+                        while pending and pending[0] and pending[0][0] == message_type:
+                            parts.append(pending.popleft()[1])
+                            slots.release()
+                        content = "".join(parts)
+                    await broadcast_message(message_type, content)
+                with pending_lock:
+                    if pending:
+                        continue
+                    sender_idle = True
+                    wakeup.clear()
+                await wakeup.wait()
+        finally:
+            sender_gone.set()
+
+    def push(item: tuple[str, str] | None):
+        nonlocal sender_idle
+        with pending_lock:
+            pending.append(item)
+            if not sender_idle:
+                return
+            sender_idle = False
         try:
-            loop.call_soon_threadsafe(asyncio.create_task, coro)
+            loop.call_soon_threadsafe(wakeup.set)
         except RuntimeError:
             pass
 
-    def producer():
-        accumulated: list[str] = []
+    def send(message_type: str, content: str):
+        while not slots.acquire(timeout=1.0):
+            if sender_gone.is_set():
+                return
+        push((message_type, content))
+
+    def producer() -> tuple[str, Dict[str, int], List[Dict[str, Any]]]:
+        # Names used on every token, bound to locals once for the hot loop
+        state = app_state
+        monotonic = time.monotonic
+
+        accumulated = io.StringIO()
+        has_text = False
         thinking_tokens: list[str] = []
         final_message_content: str | None = None
         collected_token_stats: Dict[str, int] = {
@@ -121,75 +305,80 @@ async def stream_ollama_chat(
             "eval_count": 0,
         }
 
+        # Tokens waiting to be broadcast as a single chunk
+        pending_content: list[str] = []
+        pending_thinking: list[str] = []
+        last_flush = monotonic()
+
+        def flush():
+            nonlocal last_flush
+            if pending_thinking:
+                send("thinking_chunk", "".join(pending_thinking))
+                pending_thinking.clear()
+            if pending_content:
+                send("response_chunk", "".join(pending_content))
+                pending_content.clear()
+            last_flush = monotonic()
+
+        def maybe_flush():
+            if (
+                len(pending_content) + len(pending_thinking) >= _FLUSH_MAX_TOKENS
+                or monotonic() - last_flush >= _FLUSH_INTERVAL_S
+            ):
+                flush()
+
         try:
             chat_kwargs: Dict[str, Any] = {
+                **_STREAM_CHAT_KWARGS,
                 "model": app_state.selected_model,
                 "messages": messages,
-                "stream": True,
-                "options": {"num_ctx": 32768},
             }
             if should_pass_tools:
                 chat_kwargs["tools"] = mcp_manager.get_ollama_tools()
 
-            generator = chat(**chat_kwargs)
+            generator = _client.chat(**chat_kwargs)
 
-            for idx, chunk in enumerate(generator):
+            extractor = None
+            token_stats: Dict[str, Any] | None = None
+            for chunk in generator:
                 # Check if stop was requested
-                if app_state.stop_streaming:
+                if state.stop_streaming:
                     break
 
-                content_token, thinking_token = _extract_token(chunk)
+                if extractor is None:
+                    extractor = _pick_extractor(chunk)
+                content_token, thinking_token = extractor(chunk)
 
                 # Handle thinking tokens
                 if thinking_token:
                     thinking_tokens.append(thinking_token)
-                    safe_schedule(broadcast_message("thinking_chunk", thinking_token))
+                    pending_thinking.append(thinking_token)
 
                 # Handle regular content
                 if content_token:
-                    if thinking_tokens and not accumulated:
-                        safe_schedule(broadcast_message("thinking_complete", ""))
-                    accumulated.append(content_token)
-                    safe_schedule(broadcast_message("response_chunk", content_token))
+                    if thinking_tokens and not has_text:
+                        flush()
+                        send("thinking_complete", "")
+                    accumulated.write(content_token)
+                    has_text = True
+                    pending_content.append(content_token)
+
+                maybe_flush()
 
                 # Handle unexpected tool calls in the stream
-                if hasattr(chunk, "message"):
-                    msg = getattr(chunk, "message")
-                    if msg and hasattr(msg, "tool_calls") and msg.tool_calls:
-                        for tool_call in msg.tool_calls:
-                            fn = tool_call.function.name
-                            args = tool_call.function.arguments
-                            tool_text = f"\n\n[Model requested tool: {fn}({args})]"
-
-                            if thinking_tokens and not accumulated:
-                                safe_schedule(
-                                    broadcast_message("thinking_complete", "")
-                                )
-
-                            accumulated.append(tool_text)
-                            safe_schedule(
-                                broadcast_message("response_chunk", tool_text)
-                            )
-                elif isinstance(chunk, dict):
-                    msg = chunk.get("message", {})
-                    if isinstance(msg, dict) and msg.get("tool_calls"):
-                        for tool_call in msg["tool_calls"]:
-                            fn = tool_call.get("function", {}).get("name", "unknown")
-                            args = tool_call.get("function", {}).get("arguments", {})
-                            tool_text = f"\n\n[Model requested tool: {fn}({args})]"
-
-                            if thinking_tokens and not accumulated:
-                                safe_schedule(
-                                    broadcast_message("thinking_complete", "")
-                                )
-
-                            accumulated.append(tool_text)
-                            safe_schedule(
-                                broadcast_message("response_chunk", tool_text)
-                            )
+                for fn, args in _iter_tool_calls(chunk):
+                    tool_text = f"\n\n[Model requested tool: {fn}({args})]"
+
+                    if thinking_tokens and not has_text:
+                        flush()
+                        send("thinking_complete", "")
+
+                    accumulated.write(tool_text)
+                    has_text = True
+                    pending_content.append(tool_text)
 
                 # Track final message and token stats
-                if hasattr(chunk, "done") and getattr(chunk, "done"):
+                if getattr(chunk, "done", False):
                     token_stats = {
                         "prompt_eval_count": getattr(chunk, "prompt_eval_count", 0),
                         "eval_count": getattr(chunk, "eval_count", 0),
@@ -198,91 +387,82 @@ async def stream_ollama_chat(
                         token_stats["prompt_eval_count"] or 0
                     )
                     collected_token_stats["eval_count"] = token_stats["eval_count"] or 0
-                    safe_schedule(
-                        broadcast_message("token_usage", json.dumps(token_stats))
-                    )
 
-                    if hasattr(chunk, "message"):
-                        msg = getattr(chunk, "message")
-                        if msg is not None and hasattr(msg, "content"):
-                            mc = getattr(msg, "content")
-                            if isinstance(mc, str) and mc:
-                                final_message_content = mc
+                    msg = getattr(chunk, "message", None)
+                    if msg is not None:
+                        mc = getattr(msg, "content", None)
+                        if isinstance(mc, str) and mc:
+                            final_message_content = mc
+
+            # Deliver anything still buffered (also covers stop_streaming)
+            flush()
+
+            # Token usage is reported once, after the final chunk's text
+            if token_stats is not None:
+                send("token_usage", json.dumps(token_stats))
 
             # Handle edge cases
-            if thinking_tokens and not accumulated:
-                safe_schedule(broadcast_message("thinking_complete", ""))
-
-            if not accumulated and final_message_content:
-                accumulated.append(final_message_content)
-                safe_schedule(
-                    broadcast_message("response_chunk", final_message_content)
-                )
-            elif not accumulated and not app_state.stop_streaming:
+            if thinking_tokens and not has_text:
+                send("thinking_complete", "")
+
+            if not has_text and final_message_content:
+                accumulated.write(final_message_content)
+                has_text = True
+                send("response_chunk", final_message_content)
+            elif not has_text and not app_state.stop_streaming:
                 # Fallback to non-streaming call if streaming yielded nothing
                 try:
                     print("[Ollama] Stream empty. Attempting non-streamed fallback...")
                     fallback_kwargs: Dict[str, Any] = {
+                        **_FALLBACK_CHAT_KWARGS,
                         "model": app_state.selected_model,
                         "messages": messages,
-                        "stream": False,
-                        "options": {"num_ctx": 32768},
                     }
                     # Don't pass tools in fallback - just get a text response
-                    fallback = chat(**fallback_kwargs)
+                    fallback = _client.chat(**fallback_kwargs)
 
                     content_str = ""
-                    if hasattr(fallback, "message"):
-                        msg = getattr(fallback, "message")
-                        if msg:
-                            # Check for thinking content in fallback
-                            if hasattr(msg, "thinking") and msg.thinking:
-                                safe_schedule(
-                                    broadcast_message("thinking_chunk", msg.thinking)
-                                )
-                                safe_schedule(
-                                    broadcast_message("thinking_complete", "")
-                                )
-
-                            if hasattr(msg, "content") and msg.content:
-                                content_str = msg.content
+                    msg = getattr(fallback, "message", None)
+                    if msg:
+                        # Check for thinking content in fallback
+                        thinking = getattr(msg, "thinking", None)
+                        if thinking:
+                            send("thinking_chunk", thinking)
+                            send("thinking_complete", "")
+
+                        content_str = getattr(msg, "content", None) or ""
 
                     if content_str:
-                        accumulated.append(content_str)
-                        safe_schedule(broadcast_message("response_chunk", content_str))
+                        accumulated.write(content_str)
+                        has_text = True
+                        send("response_chunk", content_str)
                     else:
-                        safe_schedule(
-                            broadcast_message(
-                                "error",
-                                "No content tokens extracted from stream (and fallback failed).",
-                            )
-                        )
-                except Exception as e:
-                    safe_schedule(
-                        broadcast_message(
+                        send(
                             "error",
-                            f"No content tokens extracted from stream. Fallback error: {e}",
+                            "No content tokens extracted from stream (and fallback failed).",
                         )
+                except Exception as e:
+                    send(
+                        "error",
+                        f"No content tokens extracted from stream. Fallback error: {e}",
                     )
 
-            safe_schedule(broadcast_message("response_complete", ""))
-            loop.call_soon_threadsafe(
-                done_future.set_result,
-                ("".join(accumulated), collected_token_stats, tool_calls_list),
-            )
+            send("response_complete", "")
+            return accumulated.getvalue(), collected_token_stats, tool_calls_list
 
         except Exception as e:
             err = f"Error streaming from Ollama: {e}"
             print(err)
-            safe_schedule(broadcast_message("error", err))
-            if not done_future.done():
-                loop.call_soon_threadsafe(
-                    done_future.set_result,
-                    (err, collected_token_stats, tool_calls_list),
-                )
+            flush()
+            send("error", err)
+            return err, collected_token_stats, tool_calls_list
+        finally:
+            push(None)
 
-    threading.Thread(target=producer, daemon=True).start()
-    return await done_future
+    sender_task = asyncio.create_task(sender())
+    result = await loop.run_in_executor(_STREAM_EXECUTOR, producer)
+    await sender_task
+    return result
 
 
 async def _broadcast_tool_final_response(
@@ -325,58 +505,103 @@ async def _broadcast_tool_final_response(
     return content, token_stats, tool_calls_list
 
 
-def _extract_token(chunk) -> tuple[str | None, str | None]:
-    """
-    Extract content and thinking tokens from a streaming chunk.
+def _extract_token_dict(chunk: Dict[str, Any]) -> tuple[str | None, str | None]:
+    """Extract (content_token, thinking_token) from a dict chunk (older client)."""
+    content_token = None
+    thinking_token = None
 
-    Supports both dict (older client) and object (dataclass) shapes.
-    Returns (content_token, thinking_token).
-    """
+    msg = chunk.get("message")
+    if isinstance(msg, dict):
+        val = msg.get("content")
+        if isinstance(val, str) and val:
+            content_token = val
+        val = msg.get("thinking")
+        if isinstance(val, str) and val:
+            thinking_token = val
+    if not content_token:
+        for key in ("response", "content", "delta", "text", "token"):
+            tok = chunk.get(key)
+            if isinstance(tok, str) and tok:
+                content_token = tok
+                break
+    return (content_token, thinking_token)
+
+
+def _extract_token_obj(chunk: Any) -> tuple[str | None, str | None]:
+    """Extract (content_token, thinking_token) from an object (dataclass) chunk."""
     content_token = None
     thinking_token = None
 
-    # Dict-based chunk
-    if isinstance(chunk, dict):
-        msg = chunk.get("message")
-        if isinstance(msg, dict):
-            content_token = (
-                msg.get("content")
-                if isinstance(msg.get("content"), str) and msg.get("content")
-                else None
-            )
-            thinking_token = (
-                msg.get("thinking")
-                if isinstance(msg.get("thinking"), str) and msg.get("thinking")
-                else None
-            )
-        if not content_token:
-            for key in ("response", "content", "delta", "text", "token"):
-                tok = chunk.get(key)
-                if isinstance(tok, str) and tok:
-                    content_token = tok
-                    break
-        return (content_token, thinking_token)
-
-    # Object-based chunk
-    if hasattr(chunk, "message"):
-        msg = getattr(chunk, "message")
-        if msg is not None:
-            if hasattr(msg, "thinking"):
-                val = getattr(msg, "thinking")
-                if isinstance(val, str) and val:
-                    thinking_token = val
-            if hasattr(msg, "content"):
-                val = getattr(msg, "content")
-                if isinstance(val, str) and val:
-                    content_token = val
+    msg = getattr(chunk, "message", None)
+    if msg is not None:
+        val = getattr(msg, "thinking", None)
+        if isinstance(val, str) and val:
+            thinking_token = val
+        val = getattr(msg, "content", None)
+        if isinstance(val, str) and val:
+            content_token = val
 
     # Fallback for content
     if not content_token:
         for attr in ("response", "content", "delta", "token"):
-            if hasattr(chunk, attr):
-                val = getattr(chunk, attr)
-                if isinstance(val, str) and val:
-                    content_token = val
-                    break
-
+            val = getattr(chunk, attr, None)
+            if isinstance(val, str) and val:
+                content_token = val
+                break
     return (content_token, thinking_token)
+
+
+def _extract_token_message(chunk: Any) -> tuple[str | None, str | None]:
+    """
+    Fast path for chat response objects, whose tokens are always on .message.
+
+    Skips the top-level fallback attributes that _extract_token_obj probes
+    whenever a chunk carries no content (e.g. every thinking token).
+    """
+    # Message.content and .thinking are Optional[str], so "or None" maps
+    # empty strings to None without per-token type checks
+    try:
+        msg = chunk.message
+        return (msg.content or None, msg.thinking or None)
+    except AttributeError:
+        return (None, None)
+
+
+def _iter_tool_calls(chunk: Any) -> List[tuple[str, Any]]:
+    """
+    Return (function_name, arguments) for any tool calls in a streaming chunk.
+
+    Handles both dict and object chunk shapes. Returns an empty list for the
+    common case of a chunk without tool calls.
+    """
+    if isinstance(chunk, dict):
+        msg = chunk.get("message")
+        if not isinstance(msg, dict) or not msg.get("tool_calls"):
+            return []
+        calls = []
+        for tool_call in msg["tool_calls"]:
+            function = tool_call.get("function", {})
+            calls.append(
+                (function.get("name", "unknown"), function.get("arguments", {}))
+            )
+        return calls
+
+    msg = getattr(chunk, "message", None)
+    tool_calls = getattr(msg, "tool_calls", None) if msg else None
+    if not tool_calls:
+        return []
+    return [(tc.function.name, tc.function.arguments) for tc in tool_calls]
+
+
+def _pick_extractor(chunk: Any) -> Callable[[Any], tuple[str | None, str | None]]:
+    """
+    Choose the token extractor for a stream from its first chunk.
+
+    Every chunk in one stream comes from the same client and has the same
+    shape, so the dict/object check is done once instead of per token.
+    """
+    if isinstance(chunk, dict):
+        return _extract_token_dict
+    if getattr(chunk, "message", None) is not None:
+        return _extract_token_message
+    return _extract_token_obj
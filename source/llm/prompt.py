@@ -1,10 +1,14 @@
 """
 source/llm/prompt.py
 Builds the Xpdite system prompt before each LLM call.
-Interpolated at request time — never hardcoded or cached.
+Interpolated at request time. The OS description is cached for the life of
+the process and the date string for up to a minute.
 """
 
+import functools
 import platform
+import re
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -37,8 +41,24 @@ Prefer showing work inline over long preambles.
 {{skills_block}}\
 """
 
+# Matches every supported {{placeholder}} so a template is filled in one pass.
+# Unknown {{...}} and single braces are left untouched.
+_PLACEHOLDER_RE = re.compile(r"\{\{(current_datetime|os_info|skills_block)\}\}")
+
+
+@functools.lru_cache(maxsize=8)
+def _split_template(template: str) -> tuple[str, ...]:
+    """Split a template into alternating literal text and placeholder names."""
+    return tuple(_PLACEHOLDER_RE.split(template))
+
 
 def _get_datetime() -> str:
+    # Re-rendered at most once a minute; the prompt only shows the date
+    return _get_datetime_cached(int(time.time()) // 60)
+
+
+@functools.lru_cache(maxsize=2)
+def _get_datetime_cached(minute: int) -> str:
     now = datetime.now().astimezone()
     # Cross-platform: build format manually to avoid %-d issues on Windows
     day = str(now.day)       # no zero-padding
@@ -48,6 +68,7 @@ def _get_datetime() -> str:
     return f"{weekday}, {month} {day} {year}"
 
 
+@functools.lru_cache(maxsize=1)
 def _get_os_info() -> str:
     system = platform.system()
     machine = platform.machine()
@@ -86,8 +107,11 @@ def build_system_prompt(skills_block: str = "", template: str | None = None) ->
         Fully interpolated system prompt string ready to pass to any provider.
     """
     base = template if template and template.strip() else _BASE_TEMPLATE
-    prompt = base
-    prompt = prompt.replace("{{current_datetime}}", _get_datetime())
-    prompt = prompt.replace("{{os_info}}", _get_os_info())
-    prompt = prompt.replace("{{skills_block}}", skills_block)
-    return prompt
+    values = {
+        "current_datetime": _get_datetime(),
+        "os_info": _get_os_info(),
+        "skills_block": skills_block,
+    }
+    parts = list(_split_template(base))
+    parts[1::2] = [values[name] for name in parts[1::2]]
+    return "".join(parts)
@@ -6,9 +6,27 @@ model name prefix. Cloud models use the format "provider/model-name" (e.g.,
 "anthropic/claude-sonnet-4-20250514"). Ollama models have no prefix.
 """
 
-from typing import List, Dict, Any, Tuple
+import asyncio
+import functools
+from typing import List, Dict, Any, Optional, Tuple
 
+from ..config import LLM_RESPONSE_CACHE
+from ..core.connection import broadcast_message
+from ..core.state import app_state
+from ..core.thread_pool import run_in_thread
+from ..database import db
+from ..mcp_integration.manager import mcp_manager
+from ..mcp_integration.skill_injector import get_skills_to_inject, build_skills_prompt_block
+from . import cache as response_cache
+from .cloud_provider import broadcast_tool_final_response, stream_cloud_chat
+from .key_manager import key_manager
+from .prompt import build_system_prompt
 
+
+_CLOUD_PROVIDERS = frozenset(("anthropic", "openai", "gemini"))
+
+
+@functools.lru_cache(maxsize=64)
 def parse_provider(model_name: str) -> Tuple[str, str]:
     """
     Parse a model name into (provider, model).
@@ -21,11 +39,32 @@ def parse_provider(model_name: str) -> Tuple[str, str]:
     """
     if "/" in model_name:
         provider, _, model = model_name.partition("/")
-        if provider in ("anthropic", "openai", "gemini"):
+        if provider in _CLOUD_PROVIDERS:
             return provider, model
     return "ollama", model_name
 
 
+def _build_system_prompt(forced_skills: List[Dict[str, Any]] | None) -> str:
+    """Build the system prompt, including any skills to inject. Blocking (SQLite)."""
+    # Build skills block for system prompt
+    # For now, pass empty retrieved_tools — auto-detection happens based on
+    # whatever tools the retriever selects. We'll pass the actual filtered
+    # tools once available, but forced_skills from slash commands work immediately.
+    skills_to_inject = get_skills_to_inject(
+        retrieved_tools=[],
+        forced_skills=forced_skills or [],
+        db=db,
+        mcp_manager=mcp_manager,
+    )
+    skills_block = build_skills_prompt_block(skills_to_inject)
+
+    if skills_to_inject:
+        print(f"[Skills] Injecting {len(skills_to_inject)} skill(s): {[s['skill_name'] for s in skills_to_inject]}")
+
+    custom_template = db.get_system_prompt_template()
+    return build_system_prompt(skills_block=skills_block, template=custom_template)
+
+
 async def route_chat(
     model_name: str,
     user_query: str,
@@ -44,30 +83,6 @@ async def route_chat(
     """
     provider, model = parse_provider(model_name)
 
-    from ..database import db
-    from .prompt import build_system_prompt
-    from ..mcp_integration.skill_injector import get_skills_to_inject, build_skills_prompt_block
-    from ..mcp_integration.manager import mcp_manager
-    from ..core.state import app_state
-
-    # Build skills block for system prompt
-    # For now, pass empty retrieved_tools — auto-detection happens based on
-    # whatever tools the retriever selects. We'll pass the actual filtered
-    # tools once available, but forced_skills from slash commands work immediately.
-    skills_to_inject = get_skills_to_inject(
-        retrieved_tools=[],
-        forced_skills=forced_skills or [],
-        db=db,
-        mcp_manager=mcp_manager,
-    )
-    skills_block = build_skills_prompt_block(skills_to_inject)
-
-    if skills_to_inject:
-        print(f"[Skills] Injecting {len(skills_to_inject)} skill(s): {[s['skill_name'] for s in skills_to_inject]}")
-
-    custom_template = db.get_setting("system_prompt_template")
-    system_prompt = build_system_prompt(skills_block=skills_block, template=custom_template)
-
     if provider == "ollama":
         if app_state.stop_streaming:
             return "", {"prompt_eval_count": 0, "eval_count": 0}, []
@@ -75,19 +90,14 @@ async def route_chat(
         # Use existing Ollama pipeline (MCP tool handling is built-in)
         from .ollama_provider import stream_ollama_chat
 
+        system_prompt = await run_in_thread(_build_system_prompt, forced_skills)
         return await stream_ollama_chat(user_query, image_paths, chat_history, system_prompt)
 
     # Cloud provider path
-    from .key_manager import key_manager
-    from .cloud_provider import stream_cloud_chat
-    from ..mcp_integration.cloud_tool_handlers import handle_cloud_tool_calls
-    from ..mcp_integration.manager import mcp_manager
-
     # Get API key
-    api_key = key_manager.get_api_key(provider)
+    # Off the loop: the first lookup per provider reads SQLite and decrypts
+    api_key = await run_in_thread(key_manager.get_api_key, provider)
     if not api_key:
-        from ..core.connection import broadcast_message
-
         await broadcast_message(
             "error", f"No API key configured for {provider}. Add one in Settings."
         )
@@ -99,51 +109,69 @@ async def route_chat(
 
     # MCP tool calling phase (runs before streaming)
     tool_calls_list: List[Dict[str, Any]] = []
+    pre_computed_response: Optional[Dict[str, Any]] = None
     
     if app_state.stop_streaming:
         return "", {"prompt_eval_count": 0, "eval_count": 0}, []
 
+    # The prompt is built on a worker thread while the tool phase retrieves
+    # tools, and only awaited once a provider call needs it.
+    prompt_task = asyncio.ensure_future(
+        run_in_thread(_build_system_prompt, forced_skills)
+    )
+
     if mcp_manager.has_tools():
+        # Imported here, like stream_ollama_chat: the MCP handlers import
+        # services -> conversations -> this module.
+        from ..mcp_integration.cloud_tool_handlers import handle_cloud_tool_calls
+
         try:
             # Preserve images in messages so cloud models can analyze image content
-            # (e.g. extract a URL from a screenshot) when deciding which tools to call
-            messages_for_tools = []
-            for m in chat_history:
-                entry = {"role": m["role"], "content": m["content"]}
-                if m.get("images"):
-                    entry["images"] = m["images"]
-                messages_for_tools.append(entry)
+            # (e.g. extract a URL from a screenshot) when deciding which tools to call.
+            # History dicts are passed as-is: the tool handlers only read their
+            # role/content/images and never mutate them.
             user_entry: Dict[str, Any] = {"role": "user", "content": user_query}
             if image_paths:
                 user_entry["images"] = image_paths
-            messages_for_tools.append(user_entry)
+            messages_for_tools = [*chat_history, user_entry]
 
-            _, tool_calls_list, _ = await handle_cloud_tool_calls(
-                provider, model, api_key, messages_for_tools, image_paths
+            _, tool_calls_list, pre_computed_response = await handle_cloud_tool_calls(
+                provider, model, api_key, messages_for_tools, image_paths,
+                system_prompt=prompt_task,
             )
         except Exception as e:
             print(f"[Router] Cloud tool calling phase failed: {e}")
 
-    # Build updated chat history with tool exchange for context
-    updated_history = list(chat_history)
-    
+    system_prompt = await prompt_task
+
     if app_state.stop_streaming:
         return "", {"prompt_eval_count": 0, "eval_count": 0}, tool_calls_list
 
-    if tool_calls_list:
-        # Add tool results as context so the streaming call knows about them
-        tool_summary = "\n".join(
-            f"[Tool: {tc['name']}] Result: {tc['result'][:500]}"
-            for tc in tool_calls_list
+    if pre_computed_response is not None:
+        # Anthropic/OpenAI: the tool loop read the full tool results as tool
+        # results and its last call already produced the answer, so it is
+        # broadcast directly instead of asking the model a second time
+        response_text, token_stats, _ = await broadcast_tool_final_response(
+            pre_computed_response, tool_calls_list
         )
+    elif tool_calls_list:
+        # Add tool results as context so the streaming call knows about them
+        # Collect the pieces and join once, rather than formatting a new
+        # string per tool and joining those
+        parts: List[str] = []
+        for tc in tool_calls_list:
+            if parts:
+                parts.append("\n")
+            parts += ("[Tool: ", tc["name"], "] Result: ", tc["result"][:500])
+        tool_summary = "".join(parts)
         # Inject tool results as a system-level context message
-        updated_history = list(chat_history)
-        updated_history.append(
+        updated_history = [
+            *chat_history,
             {
                 "role": "user",
                 "content": f"[System: The following tool calls were executed to help answer the query]\n{tool_summary}\n\n[Original query: {user_query}]",
-            }
-        )
+            },
+        ]
         # The streaming call uses the original user_query but with tool context
         response_text, token_stats, _ = await stream_cloud_chat(
             provider,
@@ -155,7 +183,18 @@ async def route_chat(
             system_prompt=system_prompt,
         )
     else:
-        # No tools needed — straight streaming
+        # No tools needed — straight streaming (or a replay, when the
+        # optional response cache has this exact request)
+        cache_key = None
+        if LLM_RESPONSE_CACHE:
+            history = response_cache.history_digest(chat_history)
+            cache_key, cached = await run_in_thread(
+                response_cache.lookup_response,
+                provider, model, system_prompt, history, user_query, image_paths,
+            )
+            if cached is not None:
+                return await response_cache.replay_response(cached)
+
         response_text, token_stats, _ = await stream_cloud_chat(
             provider,
             model,
@@ -166,4 +205,8 @@ async def route_chat(
             system_prompt=system_prompt,
         )
 
+        # Only complete responses are cached; errors report no output tokens
+        if cache_key and token_stats.get("eval_count") and not app_state.stop_streaming:
+            await run_in_thread(response_cache.store_response, cache_key, response_text)
+
     return response_text, token_stats, tool_calls_list
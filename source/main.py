@@ -53,17 +53,28 @@ from .mcp_integration.manager import init_mcp_servers
 from .services.screenshots import process_screenshot, process_screenshot_start
 
 
-def find_available_port(
+def bind_available_port(
     start_port: int = DEFAULT_PORT, max_attempts: int = MAX_PORT_ATTEMPTS
-) -> int:
-    """Find an available port starting from start_port."""
+) -> socket.socket:
+    """
+    Bind the first available port starting from start_port.
+
+    The bound socket is handed to uvicorn as-is, so nothing can take the
+    port between the probe and the server binding it.
+    """
     for port in range(start_port, start_port + max_attempts):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if sys.platform != "win32":
+            # Rebind straight after a restart while old connections sit in
+            # TIME_WAIT. On Windows the same option would let two servers
+            # share the port, so it is left off there.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind(("", port))
-                return port
+            sock.bind(("0.0.0.0", port))
         except OSError:
+            sock.close()
             continue
+        return sock
     raise RuntimeError(
         f"Could not find available port in range {start_port}-{start_port + max_attempts - 1}"
     )
@@ -72,7 +83,8 @@ def find_available_port(
 def start_server():
     """Start FastAPI server in the current thread & store its loop."""
     try:
-        port = find_available_port()
+        sock = bind_available_port()
+        port = sock.getsockname()[1]
         print(f"Starting server on port {port}")
     except RuntimeError as e:
         print(f"Error finding available port: {e}")
@@ -81,6 +93,7 @@ def start_server():
     loop = asyncio.new_event_loop()
     app_state.server_loop_holder["loop"] = loop
     app_state.server_loop_holder["port"] = port
+    app_state.server_ready.set()
     asyncio.set_event_loop(loop)
 
     # Initialize MCP servers
@@ -89,6 +102,14 @@ def start_server():
     except Exception as e:
         print(f"[MCP] Failed to initialize servers (non-fatal): {e}")
 
+    # Derive the API-key encryption key before the first request needs it
+    try:
+        from .llm.key_manager import key_manager
+
+        key_manager.warm_up()
+    except Exception as e:
+        print(f"[KeyManager] Warm-up failed (non-fatal): {e}")
+
     # Conditionally start Google MCP servers if user has connected their account
     try:
         from .config import GOOGLE_TOKEN_FILE
@@ -104,12 +125,18 @@ def start_server():
     except Exception as e:
         print(f"[Google] Failed to start Google servers (non-fatal): {e}")
 
-    # Start uvicorn server
+    # Start uvicorn server. permessage-deflate is uvicorn's default; it is set
+    # explicitly because the batched response chunks compress well.
     config = uvicorn.Config(
-        app, host="0.0.0.0", port=port, log_level="warning", loop="asyncio"
+        app,
+        host="0.0.0.0",
+        port=port,
+        log_level="warning",
+        loop="asyncio",
+        ws_per_message_deflate=True,
     )
     server = uvicorn.Server(config)
-    loop.run_until_complete(server.serve())
+    loop.run_until_complete(server.serve(sockets=[sock]))
 
 
 def start_screenshot_service():
@@ -159,11 +186,7 @@ def main():
     app_state.server_thread.start()
 
     # Wait for server loop to be ready
-    for _ in range(50):
-        if app_state.server_loop_holder.get("loop") is not None:
-            break
-        time.sleep(0.1)
-    else:
+    if not app_state.server_ready.wait(timeout=5.0):
         print("Warning: server loop not initialized; continuing anyway.")
 
     port = app_state.server_loop_holder.get("port", DEFAULT_PORT)
@@ -187,15 +210,20 @@ def main():
     print("Press Ctrl+C to stop")
     print("=" * 50)
 
-    # Keep main thread alive
+    # Keep main thread alive until the signal handler sets shutdown_event.
+    # An untimed wait sleeps until then; on Windows it would also swallow
+    # Ctrl+C, so it wakes once a second there.
+    keepalive_timeout = 1.0 if sys.platform == "win32" else None
     try:
-        while True:
-            time.sleep(1)
+        while not app_state.shutdown_event.wait(keepalive_timeout):
+            pass
     except KeyboardInterrupt:
-        print("\nShutting down...")
-        from .core.lifecycle import cleanup_resources
+        pass
+
+    print("\nShutting down...")
+    from .core.lifecycle import cleanup_resources
 
-        cleanup_resources()
+    cleanup_resources()
 
 
 if __name__ == "__main__":
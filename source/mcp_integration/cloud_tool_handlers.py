@@ -6,7 +6,7 @@ Same loop logic as handle_mcp_tool_calls but uses cloud APIs instead of Ollama.
 """
 
 import json
-from typing import List, Dict, Any, Optional
+from typing import Awaitable, List, Dict, Any, Optional
 
 from .manager import mcp_manager
 from .retriever import retriever
@@ -23,13 +23,20 @@ async def handle_cloud_tool_calls(
     api_key: str,
     messages: List[Dict[str, Any]],
     image_paths: List[str],
+    system_prompt: Optional[Awaitable[str]] = None,
 ) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
     """
     Check for and execute MCP tool calls from cloud providers.
 
     Same return signature as handle_mcp_tool_calls:
         (updated_messages, tool_calls_made, pre_computed_response)
-        pre_computed_response is always None (caller streams the final response).
+
+    For Anthropic and OpenAI, when the tool loop ends on a response with no
+    further tool calls, that response is the final answer and comes back as
+    pre_computed_response ({"content", "thinking", "token_stats"}) for the
+    caller to broadcast, instead of being requested again. It is None when
+    no tools ran, for Gemini, or when the loop stopped with tool results the
+    model has not answered yet; the caller then streams the response.
 
     Args:
         provider: "anthropic", "openai", or "gemini"
@@ -37,6 +44,9 @@ async def handle_cloud_tool_calls(
         api_key: Decrypted API key
         messages: Conversation message history (in native chat_history format)
         image_paths: Image file paths
+        system_prompt: Awaitable resolving to the system prompt; awaited only
+            once a provider call is about to be made, so it can be built
+            while the tools are retrieved
     """
     tool_calls_made: List[Dict[str, Any]] = []
 
@@ -52,7 +62,10 @@ async def handle_cloud_tool_calls(
 
     # Get settings
     from ..database import db
-    always_on_json = db.get_setting("tool_always_on")
+    settings = await run_in_thread(
+        db.get_settings_multi, ["tool_always_on", "tool_retriever_top_k"]
+    )
+    always_on_json = settings.get("tool_always_on")
     always_on = []
     if always_on_json:
         try:
@@ -60,7 +73,7 @@ async def handle_cloud_tool_calls(
         except:
             pass
 
-    top_k_str = db.get_setting("tool_retriever_top_k")
+    top_k_str = settings.get("tool_retriever_top_k")
     top_k = int(top_k_str) if top_k_str else 5
 
     # Use Ollama tools format for retrieval as it's the standard for the retriever
@@ -80,13 +93,15 @@ async def handle_cloud_tool_calls(
     if not allowed_tool_names:
         return messages, tool_calls_made, None
 
+    system = await system_prompt if system_prompt is not None else ""
+
     if provider == "anthropic":
         return await _handle_anthropic_tools(
-            model, api_key, messages, tool_calls_made, allowed_tool_names
+            model, api_key, messages, tool_calls_made, allowed_tool_names, system
         )
     elif provider == "openai":
         return await _handle_openai_tools(
-            model, api_key, messages, tool_calls_made, allowed_tool_names
+            model, api_key, messages, tool_calls_made, allowed_tool_names, system
         )
     elif provider == "gemini":
         return await _handle_gemini_tools(
@@ -107,6 +122,7 @@ async def _handle_anthropic_tools(
     messages: List[Dict[str, Any]],
     tool_calls_made: List[Dict[str, Any]],
     allowed_tool_names: set[str],
+    system_prompt: str = "",
 ) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
     """Handle MCP tool calls via Anthropic Claude API."""
     import anthropic
@@ -124,17 +140,26 @@ async def _handle_anthropic_tools(
     # Convert messages to Anthropic format for tool detection
     anthropic_msgs = _to_anthropic_messages(messages)
 
+    create_kwargs: Dict[str, Any] = {
+        "model": model,
+        "max_tokens": 4096,
+        "messages": anthropic_msgs,
+        "tools": tools,
+    }
+    if system_prompt:
+        create_kwargs["system"] = system_prompt
+    if any(kw in model for kw in ("opus", "sonnet")):
+        # Same extended thinking as the streaming path, since the loop's last
+        # response is used as the answer. It has to be on for every call:
+        # tool_use turns sent back with thinking enabled must keep theirs.
+        create_kwargs["max_tokens"] = 16384
+        create_kwargs["thinking"] = {"type": "enabled", "budget_tokens": 10000}
+
     if app_state.stop_streaming:
         return messages, tool_calls_made, None
 
     try:
-        response = await run_in_thread(
-            client.messages.create,
-            model=model,
-            max_tokens=4096,
-            messages=anthropic_msgs,
-            tools=tools,
-        )
+        response = await run_in_thread(client.messages.create, **create_kwargs)
     except Exception as e:
         print(f"[MCP/Anthropic] Tool detection failed: {e}")
         return messages, tool_calls_made, None
@@ -235,13 +260,7 @@ async def _handle_anthropic_tools(
             break
 
         try:
-            response = await run_in_thread(
-                client.messages.create,
-                model=model,
-                max_tokens=4096,
-                messages=anthropic_msgs,
-                tools=tools,
-            )
+            response = await run_in_thread(client.messages.create, **create_kwargs)
         except Exception as e:
             print(f"[MCP/Anthropic] Follow-up call failed: {e}")
             break
@@ -253,9 +272,23 @@ async def _handle_anthropic_tools(
 
     if tool_calls_made:
         print(f"[MCP/Anthropic] Tool loop complete after {rounds} round(s)")
+        if not has_tool_use and not app_state.stop_streaming:
+            # The last follow-up already answered; hand it back as-is
+            content = response.content or []
+            usage = response.usage
+            return messages, tool_calls_made, {
+                "content": "".join(
+                    b.text for b in content if getattr(b, "type", None) == "text"
+                ),
+                "thinking": "".join(
+                    b.thinking for b in content if getattr(b, "type", None) == "thinking"
+                ),
+                "token_stats": {
+                    "prompt_eval_count": getattr(usage, "input_tokens", 0) or 0,
+                    "eval_count": getattr(usage, "output_tokens", 0) or 0,
+                },
+            }
 
-    # Update the original messages with tool exchange for context,
-    # but let the streaming path handle the final response
     return messages, tool_calls_made, None
 
 
@@ -309,6 +342,7 @@ async def _handle_openai_tools(
     messages: List[Dict[str, Any]],
     tool_calls_made: List[Dict[str, Any]],
     allowed_tool_names: set[str],
+    system_prompt: str = "",
 ) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
     """Handle MCP tool calls via OpenAI API."""
     import openai
@@ -324,6 +358,8 @@ async def _handle_openai_tools(
     client = openai.OpenAI(api_key=api_key)
 
     openai_msgs = _to_openai_messages(messages)
+    if system_prompt:
+        openai_msgs.insert(0, {"role": "system", "content": system_prompt})
 
     if app_state.stop_streaming:
         return messages, tool_calls_made, None
@@ -440,6 +476,17 @@ async def _handle_openai_tools(
 
     if tool_calls_made:
         print(f"[MCP/OpenAI] Tool loop complete after {rounds} round(s)")
+        if choice and not choice.message.tool_calls and not app_state.stop_streaming:
+            # The last follow-up already answered; hand it back as-is
+            usage = response.usage
+            return messages, tool_calls_made, {
+                "content": choice.message.content or "",
+                "thinking": "",
+                "token_stats": {
+                    "prompt_eval_count": getattr(usage, "prompt_tokens", 0) or 0,
+                    "eval_count": getattr(usage, "completion_tokens", 0) or 0,
+                },
+            }
 
     return messages, tool_calls_made, None
 
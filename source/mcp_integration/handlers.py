@@ -17,6 +17,7 @@ from .terminal_executor import is_terminal_tool, execute_terminal_tool
 from ..core.connection import broadcast_message
 from ..core.state import app_state
 from ..core.thread_pool import run_in_thread
+from ..config import OLLAMA_KEEP_ALIVE
 
 
 def _extract_response(response) -> Optional[Dict[str, Any]]:
@@ -64,12 +65,13 @@ async def handle_mcp_tool_calls(
     to the streaming path for proper token-by-token response delivery.
 
     Args:
-        messages: The conversation message history
+        messages: The conversation message history. Tool exchanges are
+                  appended to this list in place.
         image_paths: List of image paths attached to the query
 
     Returns:
         (updated_messages, tool_calls_made, pre_computed_response)
-        - updated_messages: the messages list with tool exchanges appended
+        - updated_messages: the same messages list, with tool exchanges appended
         - tool_calls_made: list of {name, args, result, server} for UI display
         - pre_computed_response: always None (caller streams the final response)
     """
@@ -87,7 +89,10 @@ async def handle_mcp_tool_calls(
 
     # Get settings
     from ..database import db
-    always_on_json = db.get_setting("tool_always_on")
+    settings = await run_in_thread(
+        db.get_settings_multi, ["tool_always_on", "tool_retriever_top_k"]
+    )
+    always_on_json = settings.get("tool_always_on")
     always_on = []
     if always_on_json:
         try:
@@ -95,7 +100,7 @@ async def handle_mcp_tool_calls(
         except:
             pass
 
-    top_k_str = db.get_setting("tool_retriever_top_k")
+    top_k_str = settings.get("tool_retriever_top_k")
     top_k = int(top_k_str) if top_k_str else 5
 
     all_tools = mcp_manager.get_ollama_tools() or []
@@ -128,6 +133,7 @@ async def handle_mcp_tool_calls(
             messages=messages,
             tools=filtered_tools,
             think=False,
+            keep_alive=OLLAMA_KEEP_ALIVE,
         )
     except Exception as e:
         print(f"[MCP] Error in tool detection call: {e}")
@@ -274,6 +280,7 @@ async def handle_mcp_tool_calls(
                 messages=messages,
                 tools=filtered_tools,
                 think=False,
+                keep_alive=OLLAMA_KEEP_ALIVE,
             )
         except Exception as e:
             print(f"[MCP] Error in follow-up call: {e}")
@@ -31,9 +31,6 @@ def get_skills_to_inject(
         db: DatabaseManager instance
         mcp_manager: McpToolManager instance (for tool→server mapping)
     """
-    all_skills = {s["skill_name"]: s for s in db.get_all_skills() if s["enabled"]}
-    forced_names = {s["skill_name"] for s in forced_skills}
-
     # Count tools per server category
     category_counts: Counter = Counter()
     if mcp_manager and retrieved_tools:
@@ -48,6 +45,9 @@ def get_skills_to_inject(
     # Auto-detect: pick the dominant server's skill if available
     auto_skill = None
     if category_counts:
+        # Skills are only loaded when there is a category to match against
+        all_skills = {s["skill_name"]: s for s in db.get_all_skills() if s["enabled"]}
+        forced_names = {s["skill_name"] for s in forced_skills}
         dominant_server = category_counts.most_common(1)[0][0]
         if dominant_server in all_skills and dominant_server not in forced_names:
             auto_skill = all_skills[dominant_server]
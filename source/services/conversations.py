@@ -6,6 +6,7 @@ Handles conversation lifecycle, persistence, and query processing.
 
 import os
 import json
+import asyncio
 from typing import List, Dict, Any, Optional
 
 from ..core.state import app_state
@@ -19,6 +20,23 @@ from ..database import db
 
 # Conversations service logic
 
+# Queries submitted while another is being answered wait here, in order
+_MAX_QUEUED_QUERIES = 4
+_query_queue: Optional[asyncio.Queue] = None
+_query_worker: Optional[asyncio.Task] = None
+
+
+async def _run_queued_queries(queue: asyncio.Queue):
+    """Run queued queries one at a time, in submission order."""
+    while True:
+        args = await queue.get()
+        try:
+            await ConversationService.submit_query(*args)
+        except Exception as e:
+            print(f"[Queue] Queued query failed: {e}")
+        finally:
+            queue.task_done()
+
 
 class ConversationService:
     """Manages conversation lifecycle and query processing."""
@@ -28,8 +46,11 @@ class ConversationService:
         """Clear screenshots and chat history for a fresh start."""
         from .terminal import terminal_service
 
+        ConversationService.drop_queued_queries()
         await ScreenshotHandler.clear_screenshots()
         app_state.chat_history = []
+        app_state.history_digests = []
+        app_state.formatted_history_cache = {}
         app_state.conversation_id = None
 
         # Reset terminal service state (ends session mode, clears tracking)
@@ -49,6 +70,8 @@ class ConversationService:
 
         # Clear current state
         app_state.chat_history = []
+        app_state.history_digests = []
+        app_state.formatted_history_cache = {}
         await ScreenshotHandler.clear_screenshots()
 
         # Load conversation from database
@@ -94,6 +117,62 @@ class ConversationService:
             ),
         )
 
+    @staticmethod
+    async def enqueue_query(
+        user_query: str,
+        capture_mode: str = "none",
+        forced_skills: list[dict] | None = None,
+        llm_query: str | None = None,
+    ):
+        """
+        Queue a query behind any that are in flight.
+
+        A single worker runs queued queries through submit_query in order, so
+        a query sent while a response is streaming starts as soon as that
+        response finishes instead of being rejected. Takes the same arguments
+        as submit_query. Clients get a query_queued message when the query
+        has to wait, or an error when the queue is full.
+        """
+        global _query_queue, _query_worker
+
+        if _query_queue is None:
+            _query_queue = asyncio.Queue(maxsize=_MAX_QUEUED_QUERIES)
+        if _query_worker is None or _query_worker.done():
+            _query_worker = asyncio.create_task(_run_queued_queries(_query_queue))
+
+        # Checked before the put: the worker may pick the query up at once
+        current = app_state.current_request
+        must_wait = (
+            current is not None and not current.is_done
+        ) or not _query_queue.empty()
+
+        try:
+            _query_queue.put_nowait((user_query, capture_mode, forced_skills, llm_query))
+        except asyncio.QueueFull:
+            await broadcast_message("error", "Too many queries waiting. Please wait.")
+            return
+
+        if must_wait:
+            await broadcast_message(
+                "query_queued",
+                json.dumps({"query": user_query, "position": _query_queue.qsize()}),
+            )
+
+    @staticmethod
+    def drop_queued_queries() -> int:
+        """Discard queries that have not started yet. Returns how many."""
+        dropped = 0
+        while _query_queue is not None:
+            try:
+                _query_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            _query_queue.task_done()
+            dropped += 1
+        if dropped:
+            print(f"[Queue] Dropped {dropped} queued quer{'y' if dropped == 1 else 'ies'}")
+        return dropped
+
     @staticmethod
     async def submit_query(
         user_query: str,
@@ -141,8 +220,11 @@ class ConversationService:
             ):
                 await ScreenshotHandler.capture_fullscreen()
 
-            # Get image paths
+            # Get image paths. The screenshots are noted so only these are
+            # cleared afterwards; ones captured while this query streams
+            # stay in context for the next query.
             image_paths = app_state.get_image_paths()
+            used_screenshot_ids = {ss["id"] for ss in app_state.screenshot_list}
 
             # Echo query to clients
             await broadcast_message("query", user_query)
@@ -152,11 +234,14 @@ class ConversationService:
 
             # Stream the response — use cleaned query (without slash commands) for the LLM
             query_for_llm = llm_query if llm_query else user_query
+            # History is passed without a copy: it is only appended to below,
+            # after route_chat returns, and clear/resume replace the list
+            # rather than mutate it
             response_text, token_stats, tool_calls = await route_chat(
                 current_model,
                 query_for_llm,
                 image_paths,
-                app_state.chat_history.copy(),
+                app_state.chat_history,
                 forced_skills=ctx.forced_skills,
             )
 
@@ -246,8 +331,19 @@ class ConversationService:
 
             # Clear screenshots after embedding in history
             if image_paths and len(app_state.screenshot_list) > 0:
-                app_state.screenshot_list.clear()
-                await broadcast_message("screenshots_cleared", "")
+                remaining = [
+                    ss for ss in app_state.screenshot_list
+                    if ss["id"] not in used_screenshot_ids
+                ]
+                if not remaining:
+                    app_state.screenshot_list.clear()
+                    await broadcast_message("screenshots_cleared", "")
+                else:
+                    app_state.screenshot_list = remaining
+                    for screenshot_id in used_screenshot_ids:
+                        await broadcast_message(
+                            "screenshot_removed", {"id": screenshot_id}
+                        )
 
         except Exception as e:
             await broadcast_message("error", f"Error processing: {e}")
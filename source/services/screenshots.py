@@ -5,13 +5,25 @@ Manages screenshot capture, storage, and lifecycle.
 """
 import os
 import asyncio
-from typing import Optional
+from typing import List, Optional
 
 from ..core.state import app_state
 from ..core.connection import broadcast_message
+from ..core.thread_pool import run_in_thread
 from ..config import SCREENSHOT_FOLDER, CaptureMode
 
 
+def _delete_files(paths: List[str]) -> None:
+    """Delete screenshot files, skipping ones already gone. Blocking."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error deleting screenshot {path}: {e}")
+
+
 class ScreenshotHandler:
     """Handles screenshot capture and management."""
     
@@ -32,10 +44,12 @@ class ScreenshotHandler:
             # Give the UI time to hide
             await asyncio.sleep(0.4)
             
-            # Take the screenshot
-            image_path = take_fullscreen_screenshot(SCREENSHOT_FOLDER)
+            # Take the screenshot (grab + PNG encode, off the event loop)
+            image_path = await run_in_thread(
+                take_fullscreen_screenshot, SCREENSHOT_FOLDER
+            )
             
-            if image_path and os.path.exists(image_path):
+            if image_path:
                 return await ScreenshotHandler.add_screenshot(image_path)
             return None
         except Exception as e:
@@ -57,7 +71,7 @@ class ScreenshotHandler:
         
         # Convert to absolute path
         abs_path = os.path.abspath(image_path)
-        thumbnail = create_thumbnail(abs_path)
+        thumbnail = await run_in_thread(create_thumbnail, abs_path)
         name = os.path.basename(abs_path)
         
         # Add to state
@@ -87,16 +101,12 @@ class ScreenshotHandler:
         """
         for ss in app_state.screenshot_list:
             if ss["id"] == screenshot_id:
-                # Delete the file
-                if os.path.exists(ss["path"]):
-                    try:
-                        os.remove(ss["path"])
-                    except Exception as e:
-                        print(f"Error deleting screenshot file: {e}")
-                
                 # Remove from state
                 app_state.remove_screenshot(screenshot_id)
                 print(f"Screenshot removed: {screenshot_id}")
+
+                # Delete the file
+                await run_in_thread(_delete_files, [ss["path"]])
                 
                 # Notify clients
                 await broadcast_message("screenshot_removed", {"id": screenshot_id})
@@ -108,16 +118,12 @@ class ScreenshotHandler:
     @staticmethod
     async def clear_screenshots():
         """Clear all screenshots from context."""
-        import json
-        
-        for ss in app_state.screenshot_list:
-            if os.path.exists(ss["path"]):
-                try:
-                    os.remove(ss["path"])
-                except Exception as e:
-                    print(f"Error deleting screenshot: {e}")
-        
+        screenshots = app_state.screenshot_list
         app_state.screenshot_list = []
+
+        if screenshots:
+            await run_in_thread(_delete_files, [ss["path"] for ss in screenshots])
+
         await broadcast_message("screenshots_cleared", "")
     
     @staticmethod
@@ -137,11 +143,7 @@ class ScreenshotHandler:
         # Only process in precision mode
         if app_state.capture_mode != CaptureMode.PRECISION:
             print(f"Hotkey capture ignored - not in precision mode")
-            if os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except Exception as e:
-                    print(f"Error deleting unused screenshot: {e}")
+            await run_in_thread(_delete_files, [image_path])
             return
         
         ss_id = await ScreenshotHandler.add_screenshot(image_path)
@@ -32,6 +32,7 @@ import { TerminalPanel } from '../components/terminal/TerminalPanel';
 // Types
 import type {
   WebSocketMessage,
+  QueryQueuedContent,
   ScreenshotAddedContent,
   ScreenshotRemovedContent,
   ConversationSavedContent,
@@ -195,6 +196,14 @@ function App() {
         chatState.startQuery(String(data.content));
         break;
 
+      case 'query_queued': {
+        const queued = (typeof data.content === 'string'
+          ? JSON.parse(data.content)
+          : data.content) as unknown as QueryQueuedContent;
+        chatState.setStatus(`Query queued (${queued.position} waiting)...`);
+        break;
+      }
+
       case 'tool_call': {
         const tc = (typeof data.content === 'string'
           ? JSON.parse(data.content)
@@ -130,6 +130,11 @@ export interface TerminalEvent {
   created_at: number;
 }
 
+export interface QueryQueuedContent {
+  query: string;
+  position: number;
+}
+
 export interface ScreenshotAddedContent {
   id: string;
   name: string;
@@ -0,0 +1,23 @@
+"""
+Shared test setup.
+
+source.config and source.database create ``user_data/`` relative to the
+working directory on import, so the suite runs from a scratch directory
+and never touches the developer's database or screenshots.
+"""
+
+import os
+import tempfile
+
+# No display or input devices are needed by the tests
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+
+
+def pytest_sessionstart(session):
+    # Before collection, which is when test modules import source.*
+    os.chdir(tempfile.mkdtemp(prefix="xpdite-tests-"))
+
+    # Load modules in the order the app does (app.py imports the API first);
+    # importing source.database or source.mcp_integration first trips over
+    # their circular import.
+    import source.api.websocket  # noqa: F401
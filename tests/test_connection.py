@@ -0,0 +1,115 @@
+"""Tests for per-client send queues in ConnectionManager."""
+
+import asyncio
+import json
+
+from source.core import connection
+from source.core.connection import ConnectionManager, _ClientQueue
+
+
+class FakeWebSocket:
+    """Records sent frames; sends block while the gate is closed."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await self.gate.wait()
+        self.sent.append(json.loads(message))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def _put(queue, message_type, content):
+    message = json.dumps({"type": message_type, "content": content})
+    return queue.put(message, message_type, content)
+
+
+def test_chunks_are_queued_separately_below_the_size():
+    queue = _ClientQueue()
+    for _ in range(3):
+        _put(queue, "response_chunk", "a")
+    assert len(queue._entries) == 3
+
+
+def test_chunks_merge_into_the_newest_entry_past_the_size():
+    queue = _ClientQueue()
+    for i in range(connection._SEND_QUEUE_SIZE):
+        _put(queue, "status", str(i))
+
+    _put(queue, "response_chunk", "a")
+    _put(queue, "response_chunk", "b")
+    _put(queue, "thinking_chunk", "t")
+    _put(queue, "thinking_chunk", "u")
+
+    assert len(queue._entries) == connection._SEND_QUEUE_SIZE + 2
+    assert json.loads(queue._entries[-2][2]) == {"type": "response_chunk", "content": "ab"}
+    assert json.loads(queue._entries[-1][2]) == {"type": "thinking_chunk", "content": "tu"}
+
+
+def test_put_fails_at_the_limit():
+    queue = _ClientQueue()
+    for i in range(connection._SEND_QUEUE_LIMIT):
+        assert _put(queue, "status", str(i))
+    assert not _put(queue, "status", "one too many")
+
+
+def test_muted_types_are_discarded():
+    queue = _ClientQueue()
+    queue.muted = {"thinking_chunk"}
+    assert _put(queue, "thinking_chunk", "hidden")
+    assert not queue._entries
+
+
+def test_backed_up_client_receives_all_streamed_text():
+    async def scenario():
+        manager = ConnectionManager()
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        ws.gate.clear()
+
+        count = connection._SEND_QUEUE_SIZE + 100
+        for _ in range(count):
+            await manager.broadcast_json("response_chunk", "x")
+        await manager.broadcast_json("response_complete", "")
+
+        ws.gate.set()
+        while not ws.sent or ws.sent[-1]["type"] != "response_complete":
+            await asyncio.sleep(0)
+        manager.disconnect(ws)
+        return ws, count
+
+    ws, count = asyncio.run(scenario())
+    chunks = [m["content"] for m in ws.sent if m["type"] == "response_chunk"]
+    assert "".join(chunks) == "x" * count
+    assert len(chunks) < count
+    assert ws.closed_with is None
+
+
+def test_slow_client_is_dropped_without_blocking_others():
+    async def scenario():
+        manager = ConnectionManager()
+        slow, healthy = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(slow)
+        await manager.connect(healthy)
+        slow.gate.clear()
+
+        for i in range(connection._SEND_QUEUE_LIMIT + 2):
+            await manager.broadcast_json("status", str(i))
+        await asyncio.sleep(0)  # let the close task run
+
+        assert slow not in manager.active_connections
+        assert healthy in manager.active_connections
+        manager.disconnect(healthy)
+        return slow, healthy
+
+    slow, healthy = asyncio.run(scenario())
+    assert slow.closed_with == 1013
+    assert len(healthy.sent) == connection._SEND_QUEUE_LIMIT + 2
@@ -0,0 +1,71 @@
+"""Tests for API key encryption and the v1 -> v2 key-derivation switch."""
+
+import os
+
+import pytest
+from cryptography.fernet import InvalidToken
+
+from source.database import db
+from source.llm.key_manager import KDF_BLAKE2B, KDF_SHA256, KeyManager, _derive_fernet
+
+
+@pytest.fixture(autouse=True)
+def fresh_install():
+    """Start every test without a salt, KDF version or stored keys."""
+    settings = ["encryption_salt", "kdf_version", "api_key_openai", "api_key_anthropic"]
+    for key in settings:
+        db.delete_setting(key)
+    yield
+    for key in settings:
+        db.delete_setting(key)
+
+
+def test_v1_install_still_decrypts_its_keys():
+    # An install from before kdf_version existed: salt only, SHA-256 keys
+    salt = os.urandom(32).hex()
+    db.set_setting("encryption_salt", salt)
+    ciphertext = _derive_fernet(salt, KDF_SHA256).encrypt(b"sk-saved-by-v1")
+    db.set_setting("api_key_openai", ciphertext.decode("utf-8"))
+
+    manager = KeyManager()
+    assert manager.get_api_key("openai") == "sk-saved-by-v1"
+
+    # Keys saved afterwards stay on v1 so older ones keep decrypting
+    manager.save_api_key("anthropic", "sk-saved-later")
+    assert db.get_setting("kdf_version") is None
+    assert KeyManager().get_api_key("anthropic") == "sk-saved-later"
+
+
+def test_new_install_uses_blake2b():
+    KeyManager().save_api_key("openai", "sk-new-install")
+
+    salt = db.get_setting("encryption_salt")
+    assert db.get_setting("kdf_version") == str(KDF_BLAKE2B)
+    ciphertext = db.get_setting("api_key_openai").encode("utf-8")
+    assert _derive_fernet(salt, KDF_BLAKE2B).decrypt(ciphertext) == b"sk-new-install"
+    with pytest.raises(InvalidToken):
+        _derive_fernet(salt, KDF_SHA256).decrypt(ciphertext)
+
+
+def test_wrong_salt_returns_none():
+    db.set_setting("encryption_salt", os.urandom(32).hex())
+    other = _derive_fernet(os.urandom(32).hex(), KDF_SHA256)
+    db.set_setting("api_key_openai", other.encrypt(b"sk-elsewhere").decode("utf-8"))
+
+    assert KeyManager().get_api_key("openai") is None
+
+
+def test_save_and_delete_update_the_cache():
+    manager = KeyManager()
+    assert manager.get_api_key("openai") is None
+
+    manager.save_api_key("openai", "sk-abcdefghijkl")
+    assert manager.get_api_key("openai") == "sk-abcdefghijkl"
+    assert manager.get_api_key_status()["openai"] == {
+        "has_key": True,
+        "masked": "sk-...ijkl",
+    }
+
+    manager.delete_api_key("openai")
+    assert manager.get_api_key("openai") is None
+    assert manager.get_api_key_status()["openai"]["has_key"] is False
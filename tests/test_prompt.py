@@ -0,0 +1,51 @@
+"""Tests for system prompt template filling."""
+
+import pytest
+
+from source.llm import prompt
+from source.llm.prompt import _split_template, build_system_prompt
+
+
+@pytest.fixture(autouse=True)
+def fixed_values(monkeypatch):
+    monkeypatch.setattr(prompt, "_get_datetime", lambda: "Monday, May 4 2026")
+    monkeypatch.setattr(prompt, "_get_os_info", lambda: "Linux 6.1 (x86_64)")
+
+
+def test_split_alternates_text_and_placeholder_names():
+    assert _split_template("a {{os_info}} b {{skills_block}}") == (
+        "a ", "os_info", " b ", "skills_block", "",
+    )
+    assert _split_template("no placeholders") == ("no placeholders",)
+
+
+def test_fills_every_placeholder():
+    template = "{{current_datetime}} | {{os_info}} | {{os_info}}{{skills_block}}"
+    result = build_system_prompt("\nskills", template=template)
+    assert result == "Monday, May 4 2026 | Linux 6.1 (x86_64) | Linux 6.1 (x86_64)\nskills"
+
+
+def test_matches_sequential_replace_for_the_default_template():
+    expected = (
+        prompt._BASE_TEMPLATE
+        .replace("{{current_datetime}}", "Monday, May 4 2026")
+        .replace("{{os_info}}", "Linux 6.1 (x86_64)")
+        .replace("{{skills_block}}", "\nskills")
+    )
+    assert build_system_prompt("\nskills") == expected
+
+
+def test_unknown_placeholders_and_single_braces_are_kept():
+    template = "{{user_name}} {json: 1} {os_info} {{os_info}}"
+    assert build_system_prompt(template=template) == (
+        "{{user_name}} {json: 1} {os_info} Linux 6.1 (x86_64)"
+    )
+
+
+def test_values_are_not_expanded_again():
+    result = build_system_prompt("{{os_info}}", template="{{skills_block}}")
+    assert result == "{{os_info}}"
+
+
+def test_blank_template_falls_back_to_default():
+    assert build_system_prompt(template="   ") == build_system_prompt()
@@ -0,0 +1,121 @@
+"""Tests for the query queue in ConversationService."""
+
+import asyncio
+import json
+
+import pytest
+
+from source.api.handlers import MessageHandler
+from source.core.request_context import RequestContext
+from source.core.state import app_state
+from source.services import conversations
+from source.services.conversations import ConversationService
+
+
+@pytest.fixture
+def queue_env(monkeypatch):
+    """Fresh queue, recorded broadcasts and a controllable submit_query."""
+    monkeypatch.setattr(conversations, "_query_queue", None)
+    monkeypatch.setattr(conversations, "_query_worker", None)
+    monkeypatch.setattr(app_state, "current_request", None)
+
+    broadcasts = []
+    submitted = []
+    env = {"broadcasts": broadcasts, "submitted": submitted, "release": None}
+
+    async def fake_broadcast(message_type, content):
+        broadcasts.append((message_type, content))
+
+    async def fake_submit(user_query, capture_mode="none", forced_skills=None, llm_query=None):
+        # Mirrors submit_query: the request is in flight until it returns
+        ctx = RequestContext()
+        app_state.current_request = ctx
+        submitted.append(user_query)
+        if env["release"] is not None:
+            await env["release"].wait()
+        ctx.mark_done()
+
+    monkeypatch.setattr(conversations, "broadcast_message", fake_broadcast)
+    monkeypatch.setattr(ConversationService, "submit_query", staticmethod(fake_submit))
+    return env
+
+
+def _queued(broadcasts):
+    return [json.loads(content) for kind, content in broadcasts if kind == "query_queued"]
+
+
+def test_queries_run_in_submission_order(queue_env):
+    async def scenario():
+        # A response is streaming, so every new query has to wait
+        app_state.current_request = RequestContext()
+        for query in ("first", "second", "third"):
+            await ConversationService.enqueue_query(query)
+
+        assert _queued(queue_env["broadcasts"]) == [
+            {"query": "first", "position": 1},
+            {"query": "second", "position": 2},
+            {"query": "third", "position": 3},
+        ]
+
+        app_state.current_request.mark_done()
+        await asyncio.wait_for(conversations._query_queue.join(), 1)
+
+    asyncio.run(scenario())
+    assert queue_env["submitted"] == ["first", "second", "third"]
+
+
+def test_idle_query_is_not_reported_as_queued(queue_env):
+    async def scenario():
+        await ConversationService.enqueue_query("only")
+        await asyncio.wait_for(conversations._query_queue.join(), 1)
+
+    asyncio.run(scenario())
+    assert queue_env["submitted"] == ["only"]
+    assert queue_env["broadcasts"] == []
+
+
+def test_full_queue_reports_error(queue_env):
+    async def scenario():
+        queue_env["release"] = asyncio.Event()
+        await ConversationService.enqueue_query("running")
+        await asyncio.sleep(0)  # worker takes it and blocks
+
+        for i in range(conversations._MAX_QUEUED_QUERIES):
+            await ConversationService.enqueue_query(f"waiting {i}")
+        await ConversationService.enqueue_query("overflow")
+
+        assert queue_env["broadcasts"][-1] == (
+            "error", "Too many queries waiting. Please wait."
+        )
+        queued = [q["query"] for q in _queued(queue_env["broadcasts"])]
+        assert "overflow" not in queued
+        assert len(queued) == conversations._MAX_QUEUED_QUERIES
+
+        queue_env["release"].set()
+        await asyncio.wait_for(conversations._query_queue.join(), 1)
+
+    asyncio.run(scenario())
+    assert queue_env["submitted"] == ["running"] + [
+        f"waiting {i}" for i in range(conversations._MAX_QUEUED_QUERIES)
+    ]
+
+
+def test_stop_drops_queued_queries(queue_env, monkeypatch):
+    monkeypatch.setattr(app_state, "stop_streaming", False)
+
+    async def scenario():
+        queue_env["release"] = asyncio.Event()
+        await ConversationService.enqueue_query("running")
+        await asyncio.sleep(0)
+        await ConversationService.enqueue_query("waiting 1")
+        await ConversationService.enqueue_query("waiting 2")
+
+        await MessageHandler(websocket=None).handle({"type": "stop_streaming"})
+        assert conversations._query_queue.empty()
+
+        queue_env["release"].set()
+        await asyncio.wait_for(conversations._query_queue.join(), 1)
+
+    asyncio.run(scenario())
+    assert queue_env["submitted"] == ["running"]
+    assert ConversationService.drop_queued_queries() == 0
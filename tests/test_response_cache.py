@@ -0,0 +1,103 @@
+"""Tests for the exact-match cloud response cache."""
+
+import asyncio
+import json
+
+import pytest
+
+from source.core.state import app_state
+from source.llm import cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_digests(monkeypatch):
+    monkeypatch.setattr(app_state, "history_digests", [])
+    monkeypatch.setattr(app_state, "stop_streaming", False)
+
+
+def _lookup(query, history=None, model="claude", images=()):
+    digest = cache.history_digest(history or [])
+    return cache.lookup_response(
+        "anthropic", model, "system", digest, query, list(images)
+    )
+
+
+def test_miss_then_hit():
+    key, cached = _lookup("cache miss then hit")
+    assert cached is None
+
+    cache.store_response(key, "stored answer")
+    assert _lookup("cache miss then hit") == (key, "stored answer")
+
+
+def test_key_changes_with_request_fields():
+    key, _ = _lookup("what is this?")
+    assert _lookup("what is that?")[0] != key
+    assert _lookup("what is this?", model="gpt")[0] != key
+    history = [{"role": "user", "content": "earlier"}]
+    assert _lookup("what is this?", history=history)[0] != key
+
+
+def test_key_changes_when_an_image_is_rewritten(tmp_path):
+    image = tmp_path / "shot.png"
+    image.write_bytes(b"first")
+    key, _ = _lookup("describe", images=[str(image)])
+
+    image.write_bytes(b"second, longer")
+    assert _lookup("describe", images=[str(image)])[0] != key
+
+
+def test_history_digest_reuses_prefix_and_rehashes_edits():
+    history = [
+        {"role": "user", "content": "one"},
+        {"role": "assistant", "content": "two"},
+    ]
+    first = cache.history_digest(history)
+    cached = list(app_state.history_digests)
+
+    history.append({"role": "user", "content": "three"})
+    cache.history_digest(history)
+    # The first two entries were reused, not recomputed
+    assert app_state.history_digests[:2] == cached
+
+    history[0]["content"] = "edited"
+    edited = cache.history_digest(history[:2])
+    assert edited != first
+
+    history[0]["content"] = "one"
+    assert cache.history_digest(history[:2]) == first
+
+
+def test_replay_streams_the_cached_text(monkeypatch):
+    sent = []
+
+    async def fake_broadcast(message_type, content):
+        sent.append((message_type, content))
+
+    monkeypatch.setattr(cache, "broadcast_message", fake_broadcast)
+    monkeypatch.setattr(cache, "_REPLAY_DELAY_S", 0)
+
+    text = "x" * (cache._REPLAY_CHUNK_CHARS * 2 + 5)
+    result = asyncio.run(cache.replay_response(text))
+
+    chunks = [c for t, c in sent if t == "response_chunk"]
+    assert len(chunks) == 3
+    assert "".join(chunks) == text
+    assert [t for t, _ in sent[-2:]] == ["response_complete", "token_usage"]
+    assert json.loads(sent[-1][1]) == {"prompt_eval_count": 0, "eval_count": 0}
+    assert result == (text, {"prompt_eval_count": 0, "eval_count": 0}, [])
+
+
+def test_replay_stops_when_streaming_is_stopped(monkeypatch):
+    sent = []
+
+    async def fake_broadcast(message_type, content):
+        sent.append(message_type)
+        if message_type == "response_chunk":
+            app_state.stop_streaming = True
+
+    monkeypatch.setattr(cache, "broadcast_message", fake_broadcast)
+    monkeypatch.setattr(cache, "_REPLAY_DELAY_S", 0)
+
+    asyncio.run(cache.replay_response("y" * (cache._REPLAY_CHUNK_CHARS * 4)))
+    assert sent == ["response_chunk", "response_complete", "token_usage"]
@@ -0,0 +1,81 @@
+"""Tests for which screenshots stay in context after a query."""
+
+import asyncio
+import os
+
+import pytest
+
+from source.core.state import app_state
+from source.services import conversations
+from source.services.conversations import ConversationService
+
+
+def _screenshot(tmp_path, ss_id):
+    path = tmp_path / f"{ss_id}.png"
+    path.write_bytes(b"png")
+    return {"id": ss_id, "name": path.name, "path": str(path), "thumbnail": ""}
+
+
+@pytest.fixture
+def query_env(monkeypatch):
+    monkeypatch.setattr(app_state, "chat_history", [])
+    monkeypatch.setattr(app_state, "screenshot_list", [])
+    monkeypatch.setattr(app_state, "conversation_id", None)
+    monkeypatch.setattr(app_state, "current_request", None)
+    monkeypatch.setattr(app_state, "selected_model", "anthropic/claude-test")
+
+    env = {"broadcasts": [], "during_response": lambda: None, "image_paths": None}
+
+    async def fake_broadcast(message_type, content):
+        env["broadcasts"].append((message_type, content))
+
+    async def fake_route_chat(model, query, image_paths, chat_history, forced_skills=None):
+        env["image_paths"] = image_paths
+        env["during_response"]()
+        return "answer", {"prompt_eval_count": 1, "eval_count": 1}, []
+
+    monkeypatch.setattr(conversations, "broadcast_message", fake_broadcast)
+    monkeypatch.setattr(conversations, "route_chat", fake_route_chat)
+    return env
+
+
+def _types(broadcasts):
+    return [message_type for message_type, _ in broadcasts]
+
+
+def test_used_screenshots_are_cleared(query_env, tmp_path):
+    first = _screenshot(tmp_path, "ss-1")
+    app_state.screenshot_list.append(first)
+
+    asyncio.run(ConversationService.submit_query("what is this?"))
+
+    assert query_env["image_paths"] == [os.path.abspath(first["path"])]
+    assert app_state.screenshot_list == []
+    assert "screenshots_cleared" in _types(query_env["broadcasts"])
+    assert app_state.chat_history[0]["images"] == query_env["image_paths"]
+
+
+def test_screenshot_taken_while_streaming_is_kept(query_env, tmp_path):
+    first = _screenshot(tmp_path, "ss-1")
+    second = _screenshot(tmp_path, "ss-2")
+    app_state.screenshot_list.append(first)
+    query_env["during_response"] = lambda: app_state.screenshot_list.append(second)
+
+    asyncio.run(ConversationService.submit_query("what is this?"))
+
+    assert app_state.screenshot_list == [second]
+    assert ("screenshot_removed", {"id": "ss-1"}) in query_env["broadcasts"]
+    assert "screenshots_cleared" not in _types(query_env["broadcasts"])
+    # The kept screenshot goes with the next query
+    assert app_state.get_image_paths() == [os.path.abspath(second["path"])]
+
+
+def test_query_without_screenshots_leaves_list_alone(query_env, tmp_path):
+    later = _screenshot(tmp_path, "ss-later")
+    query_env["during_response"] = lambda: app_state.screenshot_list.append(later)
+
+    asyncio.run(ConversationService.submit_query("hello"))
+
+    assert query_env["image_paths"] == []
+    assert app_state.screenshot_list == [later]
+    assert "screenshot_removed" not in _types(query_env["broadcasts"])